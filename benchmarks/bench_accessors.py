@@ -0,0 +1,33 @@
+import timeit
+
+from configDmanager import Config
+
+
+def build(services=50):
+    return Config({'db': {'primary': {'host': 'db1', 'port': 5432, 'dsn': 'postgres://${host}:${port}'},
+                          'replica': {'host': 'db2', 'port': 5432}},
+                   'services': {f'service{i}': {'host': 'localhost', 'port': 8000 + i} for i in range(services)}},
+                  name='Accessors')
+
+
+def main(number=20000):
+    config = build()
+    keys = ['db.primary.host', 'db.primary.port', 'db.primary.dsn', 'db.replica.host', 'db.replica.port']
+    benchmarks = {
+        "config['db.primary.host']": lambda: config['db.primary.host'],
+        'config.db.primary.host': lambda: config.db.primary.host,
+    }
+    if hasattr(config, 'accessor'):
+        host = config.accessor('db.primary.host')
+        benchmarks['accessor()'] = host
+    benchmarks['5 keys, one by one'] = lambda: tuple(config[key] for key in keys)
+    if hasattr(config, 'get_many'):
+        benchmarks['5 keys, get_many'] = lambda: config.get_many(keys)
+    benchmarks['config[[5 keys]]'] = lambda: config[keys]
+    for name, benchmark in benchmarks.items():
+        duration = min(timeit.repeat(benchmark, number=number, repeat=5)) / number
+        print(f'{name:>26}: {duration * 1e6:7.2f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+import os
+import tempfile
+import time
+
+from bench_import_configs import write_configs
+
+from configDmanager import ConfigManager
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        names = write_configs(directory)
+        bundle_path = os.path.join(directory, 'configs.cdmb')
+        ConfigManager.bundle(names, bundle_path, directory)
+
+        start = time.perf_counter()
+        for name in names:
+            ConfigManager.import_config(name, directory)
+        files = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ConfigManager.load_bundle(bundle_path)
+        for name in names:
+            ConfigManager.import_config(name, directory)
+        bundled = time.perf_counter() - start
+        ConfigManager.clear_bundles()
+        print(f'{len(names)} YAML configs   from files: {files:.2f}s   from a bundle '
+              f'({os.path.getsize(bundle_path) / 2 ** 20:.1f} MiB): {bundled:.2f}s   ({files / bundled:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
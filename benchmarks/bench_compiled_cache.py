@@ -0,0 +1,57 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import yaml
+
+from configDmanager import ConfigManager
+
+
+def synthetic_config(services=300, fanout=8):
+    return {f'service{i}': {f'endpoint{j}': {'host': f'host{j}.internal', 'port': 8000 + j, 'enabled': j % 2 == 0,
+                                             'weights': [0.5, 1.5, 2.5], 'url': 'http://${host}:${port}'}
+                            for j in range(fanout)}
+            for i in range(services)}
+
+
+def measure(name, path, repeat=5):
+    # best import time, and the time spent reading and decoding the file ( the 'parse' phase ) in that import
+    best = (float('inf'), 0)
+    ConfigManager.instrumentation.enable()
+    for _ in range(repeat):
+        ConfigManager.instrumentation.reset()
+        start = time.perf_counter()
+        ConfigManager.import_config(name, path)
+        elapsed = time.perf_counter() - start
+        parse = ConfigManager.stats()['parse']['seconds']
+        best = min(best, (elapsed, parse))
+    ConfigManager.instrumentation.disable()
+    ConfigManager.instrumentation.reset()
+    return best
+
+
+def main():
+    config_dict = synthetic_config()
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, 'LargeYaml.yaml'), 'w') as config_file:
+            yaml.safe_dump(config_dict, config_file)
+        with open(os.path.join(directory, 'LargeJson.json'), 'w') as config_file:
+            json.dump(config_dict, config_file)
+        for name in ('LargeYaml', 'LargeJson'):
+            size = os.path.getsize(ConfigManager.locate(name, directory))
+            ConfigManager.compiled_cache = False
+            cold, cold_parse = measure(name, directory)
+            ConfigManager.compiled_cache = True
+            shutil.rmtree(os.path.join(directory, '__configcache__'), ignore_errors=True)
+            ConfigManager.import_config(name, directory)
+            warm, warm_parse = measure(name, directory)
+            print(f'{name:<10} ({size / 2 ** 20:.1f} MiB)  parsed: {cold * 1000:>7.1f} ms '
+                  f'( parse {cold_parse * 1000:>6.1f} )   compiled_cache: {warm * 1000:>7.1f} ms '
+                  f'( parse {warm_parse * 1000:>6.1f} )')
+    ConfigManager.compiled_cache = False
+
+
+if __name__ == '__main__':
+    main()
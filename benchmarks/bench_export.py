@@ -0,0 +1,47 @@
+import io
+import json
+import time
+import tracemalloc
+
+import yaml
+
+from configDmanager import Config
+from configDmanager.config_types import JsonType, YamlType
+
+
+def synthetic_config(services=300, fanout=8):
+    return {f'service{i}': {f'endpoint{j}': {'host': f'host{j}.internal', 'port': 8000 + j, 'enabled': j % 2 == 0,
+                                             'weights': [0.5, 1.5, 2.5], 'url': 'http://${host}:${port}'}
+                            for j in range(fanout)}
+            for i in range(services)}
+
+
+def measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    config = Config(synthetic_config(), name='Large')
+    config_dict = config.to_dict()
+    text = yaml.dump(config_dict, Dumper=yaml.Dumper)
+    cases = {
+        'json to_dict + json.dump': lambda: json.dump(config.to_dict(), io.StringIO(), indent=2),
+        'json streamed': lambda: JsonType.export_config_tree(config, {}, io.StringIO()),
+        'yaml load (python)': lambda: yaml.load(text, Loader=yaml.SafeLoader),
+        'yaml load (fastest)': lambda: yaml.load(text, Loader=YamlType.loader),
+        'yaml dump (python)': lambda: yaml.dump(config_dict, Dumper=yaml.Dumper),
+        'yaml dump (fastest)': lambda: yaml.dump(config_dict, Dumper=YamlType.dumper),
+    }
+    for name, function in cases.items():
+        elapsed, peak = measure(function)
+        print(f'{name:<26}: {elapsed * 1000:>8.1f} ms   peak memory: {peak / 2 ** 20:>6.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
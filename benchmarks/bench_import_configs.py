@@ -0,0 +1,40 @@
+import os
+import tempfile
+import time
+
+import yaml
+
+from configDmanager import ConfigManager
+
+
+def write_configs(directory, count=150, parents=5, keys=200):
+    for i in range(parents):
+        with open(os.path.join(directory, f'BaseConfig{i}.yaml'), 'w') as config_file:
+            yaml.dump({'__name': f'BaseConfig{i}', **{f'base_key{k}': {'value': k, 'tags': ['a', 'b']}
+                                                       for k in range(keys)}}, config_file)
+    for i in range(count):
+        with open(os.path.join(directory, f'Config{i}.yaml'), 'w') as config_file:
+            yaml.dump({'__name': f'Config{i}', '__parent': f'BaseConfig{i % parents}',
+                       **{f'key{k}': f'value {k}' for k in range(keys)}}, config_file)
+    return [f'Config{i}' for i in range(count)]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        names = write_configs(directory)
+
+        start = time.perf_counter()
+        for name in names:
+            ConfigManager.import_config(name, directory)
+        serial = time.perf_counter() - start
+
+        for max_workers in (1, 4, 8):
+            start = time.perf_counter()
+            ConfigManager.import_configs(names, directory, max_workers=max_workers)
+            batch = time.perf_counter() - start
+            print(f'{len(names)} YAML configs   import_config loop: {serial:.2f}s   '
+                  f'import_configs(max_workers={max_workers}): {batch:.2f}s   ({serial / batch:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import re
+import timeit
+
+from configDmanager import Config
+from configDmanager._template import Template
+
+c_regex = re.compile(r"\${(.*?)}")
+c_fe_regex = re.compile(r'\${(.*?)\[(.*?)\]}')
+
+
+def regex_format(config, text):
+    # The interpolation path used before templates were precompiled
+    def get_format_value(match):
+        try:
+            return str(config[match.group(1)])
+        except KeyError:
+            if re.fullmatch(c_fe_regex, match.group(0)):
+                pass
+            raise KeyError(match.group(1))
+    return re.sub(c_regex, get_format_value, text)
+
+
+def main(number=100000):
+    config = Config({'__version': {'__major': 1, '__minor': 2, '__patch': 3},
+                     'version': '${__version.__major}.${__version.__minor}.${__version.__patch}',
+                     'constant': 'A plain string without any reference' * 4})
+
+    for key in ('version', 'constant'):
+        raw = config.get_raw(key)
+        template = Template(raw)
+        legacy = timeit.timeit(lambda: regex_format(config, raw), number=number)
+        compiled = timeit.timeit(lambda: template.render(config.__getitem__, None), number=number)
+        print(f'{key:<10} regex: {number / legacy:>12,.0f} ops/s   '
+              f'template: {number / compiled:>12,.0f} ops/s   ({legacy / compiled:.2f}x)')
+
+    memoized = timeit.timeit(lambda: config['version'], number=number)
+    print(f'{"version":<10} memoized config access: {number / memoized:>12,.0f} ops/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+import timeit
+
+from configDmanager import Config
+
+
+def build(keys=200, levels=3):
+    parent = None
+    for level in range(levels):
+        parent = Config({f'level{level}_key{i}': f'${{level{level}_key{i - 1}}}.{i}' if i else 'base'
+                         for i in range(keys)}, parent, f'Level{level}')
+    return parent
+
+
+def unpack(**kwargs):
+    return len(kwargs)
+
+
+def main(number=200):
+    config = build()
+    config.validate()
+    benchmarks = {
+        'len': lambda: len(config),
+        'in': lambda: 'level0_key150' in config,
+        'iterate': lambda: sum(1 for _ in config),
+        'items': lambda: sum(1 for _ in config.items()),
+        '**config': lambda: unpack(**config),
+    }
+    for name, benchmark in benchmarks.items():
+        duration = timeit.timeit(benchmark, number=number) / number
+        print(f'{name:>9}: {duration * 1e6:9.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from configDmanager import ConfigManager
+
+
+def synthetic_config(services=400, depth=3, fanout=4):
+    def node(level):
+        if level == depth:
+            return {'host': 'localhost', 'port': 8080, 'tags': ['a', 'b'], 'url': 'http://${host}:${port}'}
+        return {f'child{i}': node(level + 1) for i in range(fanout)}
+    return {f'service{i}': node(0) for i in range(services)}
+
+
+def measure(name, path, lazy):
+    ConfigManager.lazy = lazy
+    tracemalloc.start()
+    start = time.perf_counter()
+    config = ConfigManager.import_config(name, path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert config['service0.child0.child1.child2.url'] == 'http://localhost:8080'
+    return elapsed, peak
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, 'LargeConfig.json'), 'w') as config_file:
+            json.dump(synthetic_config(), config_file)
+        for lazy in (False, True):
+            elapsed, peak = measure('LargeConfig', directory, lazy)
+            print(f'{"lazy" if lazy else "eager":<6} load: {elapsed * 1000:>8.1f} ms   peak memory: {peak / 2 ** 20:>7.1f} MiB')
+    ConfigManager.lazy = False
+
+
+if __name__ == '__main__':
+    main()
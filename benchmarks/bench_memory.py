@@ -0,0 +1,34 @@
+import gc
+import tracemalloc
+
+from configDmanager import Config
+
+
+def synthetic_config(tenants=200, services=20):
+    return {f'tenant{i}': {'__name': f'tenant{i}',
+                           **{f'service{j}': {'host': 'localhost', 'port': 8000 + j, 'tls': {'enabled': True},
+                                              'url': 'http://${host}:${port}'}
+                              for j in range(services)}}
+            for i in range(tenants)}
+
+
+def count_nodes(config):
+    return 1 + sum(count_nodes(value) for _, value in config.raw_items() if type(value) is Config)
+
+
+def main():
+    config_dict = synthetic_config()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    config = Config(config_dict, name='Tenants')
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    nodes = count_nodes(config)
+    print(f'{nodes} nodes: {used / 2 ** 20:.1f} MiB, {used / nodes:.0f} bytes per node')
+    resolved = sum(len(config[f'tenant{i}.service{j}.url']) for i in range(200) for j in range(20))
+    assert resolved
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+import os
+import tempfile
+import time
+
+from configDmanager import Config, FileReader
+
+
+def measure(config, key, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        config[key]
+    return (time.perf_counter() - start) / repeat
+
+
+def main(repeat=2000):
+    with tempfile.TemporaryDirectory() as directory:
+        for name, size in (('small.txt', 4 * 1024), ('large.txt', 8 * 1024 * 1024)):
+            with open(os.path.join(directory, name), 'w') as file:
+                file.write('x' * size)
+            config = Config({'text': f'${{read_file[{name}]}}'}, path=directory)
+            for cache_bytes in (0, 16 * 1024 * 1024):
+                FileReader.cache_bytes = cache_bytes
+                FileReader.clear_cache()
+                elapsed = measure(config, 'text', repeat if size < FileReader.mmap_threshold else repeat // 20)
+                print(f'{name:<10} cache {"on" if cache_bytes else "off":<4}: {elapsed * 1e6:>10.1f} us per access')
+    print(FileReader.cache_info())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from configDmanager import ConfigManager
+
+
+def write_config(directory, services=2000):
+    with open(os.path.join(directory, 'Large.json'), 'w') as file:
+        json.dump({'__name': 'Large', 'region': 'eu',
+                   **{f'service{i}': {'host': f'service{i}.internal', 'port': 8000 + i % 1000, 'tls': {'enabled': True},
+                                      'tags': ['internal', 'http'], 'url': 'http://${host}:${port}'}
+                      for i in range(services)}}, file)
+
+
+def measure(load):
+    # what each worker pays: loading the config and reading a few values from it
+    def run():
+        config = load()
+        return config, (config['service7.url'], config['service1999.port'], config['region'])
+
+    ConfigManager.clear_cache()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    ConfigManager.clear_cache()
+    gc.collect()
+    tracemalloc.start()
+    config, values = run()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert values[0] == 'http://service7.internal:8007'
+    return elapsed, used
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        write_config(directory)
+        elapsed, used = measure(lambda: ConfigManager.import_config('Large', directory))
+        print(f'import_config:  {elapsed * 1e3:8.2f} ms  {used / 2 ** 20:6.2f} MiB per worker')
+        with ConfigManager.publish(ConfigManager.import_config('Large', directory), f'bench-{os.getpid()}') as shared:
+            elapsed, used = measure(lambda: ConfigManager.attach(shared.name))
+            print(f'attach:         {elapsed * 1e3:8.2f} ms  {used / 2 ** 20:6.2f} MiB per worker')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+
+from configDmanager import ConfigManager
+
+
+def write_tenants(directory, tenants=500, services=20):
+    with open(os.path.join(directory, 'Defaults.json'), 'w') as file:
+        json.dump({'__name': 'Defaults', 'timeout': 30, 'retries': 3}, file)
+    for i in range(tenants):
+        with open(os.path.join(directory, f'Tenant{i}.json'), 'w') as file:
+            json.dump({'__parent': 'Defaults', 'tenant': f'tenant{i}',
+                       **{f'service{j}': {'host': 'localhost', 'port': 8000 + j, 'tls': {'enabled': True},
+                                          'tags': ['internal', 'http'], 'url': 'http://${host}:${port}'}
+                          for j in range(services)}}, file)
+
+
+def measure(directory, tenants):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    configs = [ConfigManager.import_config(f'Tenant{i}', directory) for i in range(tenants)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert configs[-1]['service3.url'] == 'http://localhost:8003'
+    return used
+
+
+def main(tenants=500):
+    with tempfile.TemporaryDirectory() as directory:
+        write_tenants(directory, tenants)
+        for share in (False, True):
+            ConfigManager.share = share
+            used = measure(directory, tenants)
+            print(f'share={share}: {used / 2 ** 20:.1f} MiB for {tenants} tenants')
+        print(ConfigManager.sharing_report())
+        ConfigManager.share = False
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+import timeit
+
+from configDmanager import Config
+
+
+def main(number=200000):
+    parent = Config({'db': {'primary': {'host': 'localhost', 'port': 5432}}, 'timeout': 30})
+    config = Config({'service': 'api', 'url': 'http://${db.primary.host}:${timeout}'}, parent=parent)
+    snapshot = config.freeze()
+
+    cases = [('dotted key', lambda c: c['db.primary.host']),
+             ('attributes', lambda c: c.db.primary.host),
+             ('parent key', lambda c: c['timeout']),
+             ('interpolated', lambda c: c['url'])]
+    for label, access in cases:
+        live = timeit.timeit(lambda: access(config), number=number)
+        frozen = timeit.timeit(lambda: access(snapshot), number=number)
+        print(f'{label:<14} Config: {number / live:>12,.0f} lookups/s   '
+              f'ConfigSnapshot: {number / frozen:>12,.0f} lookups/s   ({live / frozen:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
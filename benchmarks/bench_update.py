@@ -0,0 +1,44 @@
+import os
+import tempfile
+import time
+
+from configDmanager import Config, ConfigManager
+
+
+def bump(config):
+    return {'version': config.version + 1}
+
+
+def run(directory, names, rounds, transaction):
+    start = time.perf_counter()
+    if transaction:
+        with ConfigManager.transaction(lock=True):
+            for _ in range(rounds):
+                for name in names:
+                    ConfigManager.update_config(bump, name, directory)
+    else:
+        for _ in range(rounds):
+            for name in names:
+                ConfigManager.update_config(bump, name, directory)
+    return time.perf_counter() - start
+
+
+def main(configs=20, rounds=5):
+    with tempfile.TemporaryDirectory() as directory:
+        names = [f'Service{i}' for i in range(configs)]
+        for name in names:
+            ConfigManager.export_config(Config({'version': 0, 'settings': {f'key{j}': j for j in range(200)}}),
+                                        name, directory)
+        print(f'update_config x{configs * rounds}: {run(directory, names, rounds, False) * 1e3:.1f} ms')
+        print(f'same updates in a transaction: {run(directory, names, rounds, True) * 1e3:.1f} ms')
+        mtimes = {name: os.stat(os.path.join(directory, f'{name}.json')).st_mtime_ns for name in names}
+        start = time.perf_counter()
+        for name in names:
+            ConfigManager.update_config(lambda config: {'version': config.version}, name, directory)
+        unchanged = sum(os.stat(os.path.join(directory, f'{name}.json')).st_mtime_ns != mtimes[name] for name in names)
+        print(f'{configs} no-op updates: {(time.perf_counter() - start) * 1e3:.1f} ms, '
+              f'{configs - unchanged} files left untouched')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+from configDmanager import Config, ConfigManager
+
+# Synthetic workloads for the paths configDmanager users depend on.
+#
+#   python benchmarks/suite.py run [--output results.json] [--baseline baseline.json] [--filter regex]
+#   python benchmarks/suite.py compare baseline.json results.json [--threshold 0.1]
+#
+# compare, and run with a baseline, exit with status 1 when a benchmark lost more than threshold of its ops/s, or grew its median latency
+# or its peak memory by more than threshold.
+
+workloads = dict()
+
+
+def workload(function):
+    workloads[function.__name__] = function
+    return function
+
+
+def write(directory, name, config_dict, type_='json'):
+    with open(os.path.join(directory, f'{name}.{type_}'), 'w') as config_file:
+        if type_ == 'json':
+            json.dump(config_dict, config_file)
+        else:
+            yaml.safe_dump(config_dict, config_file)
+
+
+def flat(keys=2000):
+    return {f'key{i}': f'value {i}' if i % 3 else i for i in range(keys)}
+
+
+def nested(depth=5, fanout=4):
+    if not depth:
+        return {'host': 'localhost', 'port': 8080, 'tags': ['a', 'b'], 'enabled': True}
+    return {f'node{i}': nested(depth - 1, fanout) for i in range(fanout)}
+
+
+def references(keys=500):
+    # every key reads the previous one and one of a few shared roots, in chains of 50 keys
+    config_dict = {f'root{i}': f'r{i}' for i in range(10)}
+    config_dict['key0'] = '${root0}'
+    for i in range(1, keys):
+        config_dict[f'key{i}'] = f'${{key{i - 1}}}-${{root{i % 10}}}' if i % 50 else f'${{root{i % 10}}}'
+    return config_dict
+
+
+@workload
+def import_flat_json(directory):
+    write(directory, 'FlatJson', flat())
+    return lambda: ConfigManager.import_config('FlatJson', directory)
+
+
+@workload
+def import_flat_yaml(directory):
+    write(directory, 'FlatYaml', flat(), 'yaml')
+    return lambda: ConfigManager.import_config('FlatYaml', directory)
+
+
+@workload
+def import_nested_json(directory):
+    write(directory, 'NestedJson', nested())
+    return lambda: ConfigManager.import_config('NestedJson', directory)
+
+
+@workload
+def import_nested_yaml(directory):
+    write(directory, 'NestedYaml', nested(), 'yaml')
+    return lambda: ConfigManager.import_config('NestedYaml', directory)
+
+
+@workload
+def parent_chain(directory, length=20):
+    write(directory, 'Chain0', {'__name': 'Chain0', **flat(100)})
+    for i in range(1, length):
+        write(directory, f'Chain{i}', {'__name': f'Chain{i}', '__parent': f'Chain{i - 1}', f'level{i}': i})
+
+    def run():
+        config = ConfigManager.import_config(f'Chain{length - 1}', directory)
+        return config['key1'], len(config)
+    return run
+
+
+@workload
+def reference_graph(directory):
+    config_dict = references()
+    return lambda: Config(config_dict).freeze()
+
+
+@workload
+def detect_type(directory, candidates=40, others=500):
+    # no known extension: the type is detected from the content of every candidate
+    for i in range(candidates):
+        with open(os.path.join(directory, f'Detect.c{i}'), 'w') as candidate:
+            candidate.write('{ not json: [ nor yaml')
+    with open(os.path.join(directory, 'Detect.cfg'), 'w') as config_file:
+        json.dump(flat(50), config_file)
+    for i in range(others):
+        write(directory, f'Other{i}', {'key': i})
+    return lambda: ConfigManager.import_config('Detect', directory)
+
+
+def leaf_keys(depth=2, fanout=4):
+    # the keys of the leaves under node0.node0.node0 in nested(): 16 prefixes, each shared by four keys
+    prefixes = ['node0.node0.node0']
+    for _ in range(depth):
+        prefixes = [f'{prefix}.node{i}' for prefix in prefixes for i in range(fanout)]
+    return [f'{prefix}.{key}' for prefix in prefixes for key in ('host', 'port', 'tags', 'enabled')]
+
+
+@workload
+def get_keys(directory):
+    config, keys = Config(nested()), leaf_keys()
+    return lambda: [config[key] for key in keys]
+
+
+@workload
+def get_many(directory):
+    config, keys = Config(nested()), leaf_keys()
+    return lambda: config.get_many(keys)
+
+
+@workload
+def to_dict_nested(directory):
+    config = Config(nested())
+    return config.to_dict
+
+
+@workload
+def export_import_json(directory):
+    config = Config(nested(), name='RoundTrip')
+
+    def run():
+        ConfigManager.export_config(config, 'RoundTripJson', directory, 'json')
+        return ConfigManager.import_config('RoundTripJson', directory)
+    return run
+
+
+@workload
+def export_import_yaml(directory):
+    config = Config(nested(), name='RoundTrip')
+
+    def run():
+        ConfigManager.export_config(config, 'RoundTripYaml', directory, 'yaml')
+        return ConfigManager.import_config('RoundTripYaml', directory)
+    return run
+
+
+def measure(run, min_time=0.5, min_iterations=5, max_iterations=100000):
+    run()  # warm up caches and lazy imports
+    durations, total = [], 0
+    while (total < min_time * 1e9 or len(durations) < min_iterations) and len(durations) < max_iterations:
+        start = time.perf_counter_ns()
+        run()
+        durations.append(time.perf_counter_ns() - start)
+        total += durations[-1]
+    durations.sort()
+
+    gc.collect()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    def percentile(p):
+        return durations[min(len(durations) - 1, int(len(durations) * p))] / 1e3
+
+    return {'iterations': len(durations), 'ops_per_sec': len(durations) / (total / 1e9),
+            'p50_us': percentile(0.5), 'p90_us': percentile(0.9), 'p99_us': percentile(0.99),
+            'peak_kib': peak / 1024}
+
+
+def run_suite(pattern=None, min_time=0.5):
+    results = dict()
+    for name, setup in workloads.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        with tempfile.TemporaryDirectory() as directory:
+            results[name] = measure(setup(directory), min_time)
+        result = results[name]
+        print(f'{name:<20} {result["ops_per_sec"]:>10,.1f} ops/s   p50 {result["p50_us"]:>10,.1f}us   '
+              f'p99 {result["p99_us"]:>10,.1f}us   peak {result["peak_kib"]:>9,.1f} KiB')
+    return {'meta': {'python': sys.version.split()[0], 'platform': platform.platform(),
+                     'date': datetime.datetime.now().isoformat(timespec='seconds')},
+            'results': results}
+
+
+def compare(baseline, current, threshold=0.1):
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        changes = {'ops_per_sec': base['ops_per_sec'] / result['ops_per_sec'] - 1,
+                   'p50_us': result['p50_us'] / base['p50_us'] - 1,
+                   'peak_kib': result['peak_kib'] / base['peak_kib'] - 1 if base['peak_kib'] else 0}
+        worse = [metric for metric, change in changes.items() if change > threshold]
+        print(f'{name:<20} ops/s {result["ops_per_sec"] / base["ops_per_sec"] - 1:>+7.1%}   p50 {changes["p50_us"]:>+7.1%}   '
+              f'peak {changes["peak_kib"]:>+7.1%}   {"REGRESSION " + ", ".join(worse) if worse else "ok"}')
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmarks/suite.py')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('--output', help='JSON file receiving the results')
+    run_parser.add_argument('--filter', help='only run the benchmarks matching this regular expression')
+    run_parser.add_argument('--min-time', type=float, default=0.5, help='seconds spent on each benchmark')
+    run_parser.add_argument('--baseline', help='JSON results to compare with')
+    run_parser.add_argument('--threshold', type=float, default=0.1, help='tolerated relative slowdown')
+    compare_parser = commands.add_parser('compare', help='flag regressions between two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help='tolerated relative slowdown')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        current = run_suite(args.filter, args.min_time)
+        if args.output:
+            with open(args.output, 'w') as output:
+                json.dump(current, output, indent=2)
+        if not args.baseline:
+            return 0
+    else:
+        with open(args.current) as current:
+            current = json.load(current)
+    with open(args.baseline) as baseline:
+        regressions = compare(json.load(baseline), current, args.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
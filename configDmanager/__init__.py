@@ -1,5 +1,7 @@
 from configDmanager._config import Config
-from configDmanager._format import FormatExecutor
+from configDmanager._snapshot import ConfigSnapshot
+from configDmanager._shared import SharedConfig
+from configDmanager._format import FormatExecutor, FileReader, ExecutorRegistry, format_executors
 from configDmanager._configmanager import ConfigManager
 
 import_config = ConfigManager.import_config
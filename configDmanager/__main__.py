@@ -0,0 +1,90 @@
+import argparse
+import sys
+
+from configDmanager import Config, ConfigManager
+
+
+def compile_command(args):
+    compiled = ConfigManager.compile_tree(args.path, args.cache_dir)
+    for config_path in compiled:
+        print(config_path)
+    print(f'{len(compiled)} config file(s) compiled', file=sys.stderr)
+
+
+def bundle_command(args):
+    ConfigManager.bundle(args.names, args.output, args.path, args.type, args.freeze)
+    print(f'{len(args.names)} config(s) bundled in {args.output}', file=sys.stderr)
+
+
+def resolve_command(args):
+    # every phase of loading the config and resolving all its values, as nested spans
+    spans = []
+
+    def hook(phase, start, duration, details, error):
+        spans.append((start, duration, phase, details, error))
+
+    instrumentation = ConfigManager.instrumentation
+    enabled = instrumentation.enabled
+    instrumentation.enable()
+    instrumentation.add_hook(hook)
+    try:
+        ConfigManager.import_config(args.name, args.path, args.type).freeze()
+    finally:
+        instrumentation.remove_hook(hook)
+        instrumentation.enabled = enabled
+    ends = []
+    for start, duration, phase, details, error in sorted(spans, key=lambda span: (span[0], -span[1])):
+        while ends and ends[-1] <= start:
+            ends.pop()
+        details = ' '.join(f'{name}={value}' for name, value in details.items() if value is not None)
+        print(f'{duration / 1e6:10.3f} ms  {"  " * len(ends)}{phase} {details}{" (failed)" if error else ""}')
+        ends.append(start + duration)
+
+
+def inspect_command(args):
+    config = ConfigManager.import_config(args.name, args.path, args.type)
+    chain = []
+    level = config
+    while level is not None:
+        chain.append((level.get_name() or args.name, {key for key, _ in level.raw_items(private=False)}))
+        level = level.get_parent()
+    for key in sorted(config):
+        origin = next(name for name, keys in chain if key in keys)
+        value = config[key]
+        print(f'{key} = {value.to_dict(private=False) if isinstance(value, Config) else value!r}  [{origin}]')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m configDmanager')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    compile_parser = commands.add_parser('compile', help='precompile every config file of a directory tree')
+    compile_parser.add_argument('path')
+    compile_parser.add_argument('--cache-dir', help='write compiled files there instead of next to their source')
+    compile_parser.set_defaults(run=compile_command)
+
+    bundle_parser = commands.add_parser('bundle', help='write configs and their parents to a single bundle file')
+    bundle_parser.add_argument('names', nargs='+')
+    bundle_parser.add_argument('-o', '--output', required=True)
+    bundle_parser.add_argument('--freeze', action='append', default=[], metavar='EXECUTOR',
+                               help='store the current values of this executor ( os_environ, read_file... )')
+    bundle_parser.set_defaults(run=bundle_command)
+
+    resolve_parser = commands.add_parser('resolve', help='time every step of loading and resolving a config')
+    resolve_parser.add_argument('name')
+    resolve_parser.set_defaults(run=resolve_command)
+
+    inspect_parser = commands.add_parser('inspect', help='print the resolved values of a config and their origin')
+    inspect_parser.add_argument('name')
+    inspect_parser.set_defaults(run=inspect_command)
+
+    for command_parser in (bundle_parser, resolve_parser, inspect_parser):
+        command_parser.add_argument('--path', help='directory the names are relative to')
+        command_parser.add_argument('--type', help='type of the config files ( json, yaml... )')
+
+    args = parser.parse_args(argv)
+    args.run(args)
+
+
+if __name__ == '__main__':
+    main()
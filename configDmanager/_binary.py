@@ -0,0 +1,243 @@
+import datetime
+import hashlib
+import json
+import struct
+
+# Compact binary form of a parsed config file, used by ConfigManager's compiled cache, bundles and shared memory.
+#
+#   header: magic | version u8 | kind u8 | type (u8 length + ascii) | mtime_ns i64 | size i64 | blake2b digest
+#   value:  tag u8 followed by its payload
+#
+# The kind tells what the value is, and what the other header fields hold:
+#
+#   COMPILED  a parsed config file: its type, the source's mtime_ns and size, the digest of its text
+#   BUNDLE    configs written by ConfigManager.bundle: type 'bundle', its creation time, its number of configs,
+#             the digest of their list
+#   SHARED    a generation published by ConfigManager.publish: type 'shared', the generation as mtime_ns, size 0,
+#             an empty digest
+#
+# read_header only accepts the kind it is asked for: whatever its type, no file is ever taken for another kind.
+# Containers store their encoded length so that a reader can skip them without decoding them.
+# Unless structured, containers holding nothing JSON can not represent exactly are stored as JSON text instead: the
+# json module's C scanner decodes them several times faster than the tags could be.
+# Nothing is ever executed while decoding: only the types below can be produced.
+
+MAGIC = b'CDMB'
+VERSION = 3
+COMPILED, BUNDLE, SHARED = b'CBS'
+DIGEST_SIZE = 16
+
+NONE, TRUE, FALSE, INT, BIG_INT, FLOAT, STR, BYTES, LIST, DICT, DATE, DATETIME, JSON = b'NTFiIfsbldDMJ'
+
+_json_scalars = frozenset((str, int, float, bool, type(None)))
+_json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+_u32 = struct.Struct('<I')
+_i64 = struct.Struct('<q')
+_f64 = struct.Struct('<d')
+_container = struct.Struct('<II')
+_stamp = struct.Struct('<qq')
+
+
+class Header:
+    __slots__ = ('type', 'mtime_ns', 'size', 'digest', 'offset', 'kind')
+
+    def __init__(self, type_, mtime_ns, size, digest, offset=None, kind=COMPILED):
+        self.type = type_
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.offset = offset
+        self.kind = kind
+
+
+def digest(text):
+    return hashlib.blake2b(text.encode() if isinstance(text, str) else text, digest_size=DIGEST_SIZE).digest()
+
+
+def dumps(value, header, structured=False):
+    # structured: every container keeps its tags, for readers decoding its items one by one ( see _shared )
+    type_ = header.type.encode('ascii')
+    buffer = bytearray(MAGIC)
+    buffer.append(VERSION)
+    buffer.append(header.kind)
+    buffer.append(len(type_))
+    buffer += type_
+    buffer += _stamp.pack(header.mtime_ns, header.size)
+    buffer += header.digest
+    _encode(value, buffer, not structured)
+    return bytes(buffer)
+
+
+def read_header(data, kind=COMPILED):
+    if data[:len(MAGIC)] != MAGIC or len(data) < len(MAGIC) + 3 or data[len(MAGIC)] != VERSION or \
+            data[len(MAGIC) + 1] != kind:
+        return None
+    offset = len(MAGIC) + 3
+    end = offset + data[offset - 1]
+    try:
+        type_ = str(data[offset:end], 'ascii')
+        mtime_ns, size = _stamp.unpack_from(data, end)
+    except (UnicodeDecodeError, struct.error):
+        return None
+    offset = end + _stamp.size
+    return Header(type_, mtime_ns, size, bytes(data[offset:offset + DIGEST_SIZE]), offset + DIGEST_SIZE, kind)
+
+
+def loads(data, header=None):
+    header = header or read_header(data)
+    if header is None:
+        raise ValueError('Not a compiled config')
+    try:
+        value, end = _decode(data, header.offset)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f'Corrupted compiled config: {e}') from None
+    if end != len(data):
+        raise ValueError('Corrupted compiled config: trailing data')
+    return value
+
+
+def decode(data, offset):
+    return _decode(data, offset)[0]
+
+
+def skip(data, offset):
+    # end of the value encoded at offset, without decoding it
+    tag = data[offset]
+    offset += 1
+    if tag == DICT or tag == LIST:
+        return offset + _container.size + _container.unpack_from(data, offset)[1]
+    elif tag == INT or tag == FLOAT:
+        return offset + 8
+    elif tag == NONE or tag == TRUE or tag == FALSE:
+        return offset
+    return offset + 4 + _u32.unpack_from(data, offset)[0]
+
+
+def dict_offsets(data, offset, u32=_u32.unpack_from, container=_container.unpack_from):
+    # {key: offset of its value} of the dict encoded at offset, decoding its keys only
+    count = container(data, offset + 1)[0]
+    offset += 1 + _container.size
+    offsets = dict()
+    for _ in range(count):
+        if data[offset] == STR:
+            end = offset + 5 + u32(data, offset + 1)[0]
+            key = str(data[offset + 5:end], 'utf-8', 'surrogatepass')
+        else:
+            key, end = _decode(data, offset)
+        offsets[key] = end
+        offset = skip(data, end)
+    return offsets
+
+
+def list_offsets(data, offset):
+    count = _container.unpack_from(data, offset + 1)[0]
+    offset += 1 + _container.size
+    offsets = []
+    for _ in range(count):
+        offsets.append(offset)
+        offset = skip(data, offset)
+    return offsets
+
+
+def _encode(value, buffer, as_json=False):
+    kind = type(value)
+    if kind is str:
+        encoded = value.encode('utf-8', 'surrogatepass')
+        buffer.append(STR)
+        buffer += _u32.pack(len(encoded))
+        buffer += encoded
+    elif (kind is dict or kind is list) and as_json and _is_json(value):
+        _encode_text(JSON, _json_encoder.encode(value).encode('utf-8', 'surrogatepass'), buffer)
+    elif kind is dict or kind is list:
+        buffer.append(DICT if kind is dict else LIST)
+        start = len(buffer)
+        buffer += _container.pack(len(value), 0)
+        for item in (value.items() if kind is dict else value):
+            if kind is dict:
+                _encode(item[0], buffer)
+                item = item[1]
+            _encode(item, buffer, as_json)
+        _container.pack_into(buffer, start, len(value), len(buffer) - start - _container.size)
+    elif value is None:
+        buffer.append(NONE)
+    elif kind is bool:
+        buffer.append(TRUE if value else FALSE)
+    elif kind is int:
+        if -2 ** 63 <= value < 2 ** 63:
+            buffer.append(INT)
+            buffer += _i64.pack(value)
+        else:
+            _encode_text(BIG_INT, str(value).encode('ascii'), buffer)
+    elif kind is float:
+        buffer.append(FLOAT)
+        buffer += _f64.pack(value)
+    elif kind is bytes:
+        _encode_text(BYTES, value, buffer)
+    elif kind is datetime.datetime:
+        _encode_text(DATETIME, value.isoformat().encode('ascii'), buffer)
+    elif kind is datetime.date:
+        _encode_text(DATE, value.isoformat().encode('ascii'), buffer)
+    else:
+        raise TypeError(f'Cannot compile value of type {kind.__name__}')
+
+
+def _is_json(value):
+    # whether json gives value back unchanged: no tuple, no key that is not a str, no date...
+    kind = type(value)
+    if kind is dict:
+        return all(type(key) is str and _is_json(item) for key, item in value.items())
+    elif kind is list:
+        return all(_is_json(item) for item in value)
+    return kind in _json_scalars
+
+
+def _encode_text(tag, encoded, buffer):
+    buffer.append(tag)
+    buffer += _u32.pack(len(encoded))
+    buffer += encoded
+
+
+def _decode(data, offset, u32=_u32.unpack_from, container=_container.unpack_from):
+    tag = data[offset]
+    offset += 1
+    if tag == STR:
+        end = offset + 4 + u32(data, offset)[0]
+        return str(data[offset + 4:end], 'utf-8', 'surrogatepass'), end
+    elif tag == DICT:
+        count = container(data, offset)[0]
+        offset += 8
+        result = dict()
+        for _ in range(count):
+            key, offset = _decode(data, offset)
+            result[key], offset = _decode(data, offset)
+        return result, offset
+    elif tag == LIST:
+        count = container(data, offset)[0]
+        offset += 8
+        result = []
+        for _ in range(count):
+            item, offset = _decode(data, offset)
+            result.append(item)
+        return result, offset
+    elif tag == INT:
+        return _i64.unpack_from(data, offset)[0], offset + 8
+    elif tag == TRUE or tag == FALSE:
+        return tag == TRUE, offset
+    elif tag == NONE:
+        return None, offset
+    elif tag == FLOAT:
+        return _f64.unpack_from(data, offset)[0], offset + 8
+    end = offset + 4 + u32(data, offset)[0]
+    if tag == JSON:
+        return json.loads(str(data[offset + 4:end], 'utf-8', 'surrogatepass')), end
+    text = bytes(data[offset + 4:end])
+    if tag == BIG_INT:
+        return int(text), end
+    elif tag == BYTES:
+        return text, end
+    elif tag == DATETIME:
+        return datetime.datetime.fromisoformat(text.decode('ascii')), end
+    elif tag == DATE:
+        return datetime.date.fromisoformat(text.decode('ascii')), end
+    raise ValueError(f'Unknown tag {tag!r}')
@@ -0,0 +1,63 @@
+import threading
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, maxsize=128, weigh=None):
+        # without weigh every entry weighs 1 and maxsize is a number of entries
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.weight = 0
+        self.__weigh = weigh or (lambda value: 1)
+        self.__data = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.__lock:
+            try:
+                value = self.__data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.__data.move_to_end(key)
+            self.hits += 1
+            return value[0]
+
+    def set(self, key, value):
+        weight = self.__weigh(value)
+        with self.__lock:
+            self.__pop(key)
+            if weight > self.maxsize:
+                return
+            self.__data[key] = value, weight
+            self.weight += weight
+            while self.weight > max(self.maxsize, 0):
+                self.weight -= self.__data.popitem(last=False)[1][1]
+
+    def pop(self, key, default=None):
+        with self.__lock:
+            return self.__pop(key, default)
+
+    def clear(self):
+        with self.__lock:
+            self.__data.clear()
+            self.hits = self.misses = self.weight = 0
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.__data), 'maxsize': self.maxsize,
+                'weight': self.weight}
+
+    def __pop(self, key, default=None):
+        entry = self.__data.pop(key, None)
+        if entry is None:
+            return default
+        self.weight -= entry[1]
+        return entry[0]
+
+    def __len__(self):
+        return len(self.__data)
+
+    def __contains__(self, key):
+        return key in self.__data
@@ -1,114 +1,651 @@
-import re
+import asyncio
+import itertools
+import sys
+import weakref
 
-from collections.abc import MutableMapping
+from collections.abc import MutableMapping, ItemsView
 
 from configDmanager.errors import ReinterpretationError, FormatExecutorError
-from configDmanager._format import FileReader, EnvironReader
+from configDmanager._format import format_executors
+from configDmanager._instrument import timed
+from configDmanager._snapshot import ConfigSnapshot
+from configDmanager._template import Template
+from configDmanager._resolution import Frame, stack
 
+# Versions of key indexes, see Config.__visible_keys
+versions = itertools.count()
+missing = object()
 
-class Config(MutableMapping):
-    __c_regex = re.compile(r"\${(.*?)}")
-    __c_fe_regex = re.compile(r'\${(.*?)\[(.*?)\]}')
 
-    def __init__(self, config_dict: dict = None, parent: 'Config' = None, name: str = None, path=None, type_=None):
-        self.__config_dict = dict()
-        self.__parent = parent
-        if config_dict:
-            self.update(config_dict)
+class ConfigItems(ItemsView):
+    __slots__ = ('__items',)
 
-        # Meta data
-        if name:
-            self.__set_single_item('__name', name, private=True)
-        else:
-            self.__name = None
+    def __init__(self, mapping, items):
+        super().__init__(mapping)
+        self.__items = items
+
+    def __iter__(self):
+        return self.__items()
 
-        if type_:
-            self.__set_single_item('__type', type_, private=True)
 
-        # Format Executors
-        self.__format_exec = dict(read_file=FileReader(path),
-                                  os_environ=EnvironReader())
+class Config(MutableMapping):
+    __slots__ = ('__config_dict', '__templates', '__resolved', '__dependents', '__raw_keys', '__prefetched',
+                 '__lazy', '__parent', '__parent_loader', '__context', '__named', '__shared', '__keys',
+                 '__weakref__')
+
+    # Shared by every node until it needs its own: most nodes never memoize or prefetch anything
+    __no_items = dict()
+    __no_keys = frozenset()
+
+    def __init__(self, config_dict: dict = None, parent: 'Config' = None, name: str = None, path=None, type_=None,
+                 lazy=False, executors=None):
+        # Format Executors, shared with every nested config
+        executors = executors or format_executors
+        self.__setup((executors, path, executors.bind(path)), lazy)
+        # a callable parent is loaded on first use, see __get_parent. Its name attribute, if any, is the name of the
+        # config it returns
+        self.__set_parent(parent)
+        self.__fill(config_dict, name, type_, lazy)
 
     def get_name(self):
-        return self.__name
+        return self.__config_dict.get('__name') if self.__named else None
 
     def get_parent(self):
         try:
-            return self.__parent
+            return self.__get_parent()
         except AttributeError:
             return None
 
+    def set_parent(self, parent):
+        self.__check_writable('__parent')
+        self.__set_parent(parent)
+        object.__setattr__(self, '_Config__keys', None)
+        # any memoized value may have been read through the previous parent
+        for key in set(self.__resolved) | set(self.__dependents):
+            self.__invalidate(key)
+
     def to_dict(self, private=True, include_parent=False):
         d = dict()
-        if include_parent and self.__parent:
+        if include_parent and self.__get_parent() is not None:
             d.update(self.__parent.to_dict(private, include_parent))
-        d.update({
-            self.__reverse_parse_key(k): self.__reverse_parse_value(v, private=private, include_parent=include_parent)
-            for k, v in self.__config_dict.items() if (not k.startswith(self.__private_prefix) or private)})
-        if private and self.__parent:
-            d['__parent'] = self.__parent.get_name()
+        d.update({k: self.__reverse_parse_value(v, private=private, include_parent=include_parent)
+                  for k, v in self.__config_dict.items() if (k[:2] != '__' or private)})
+        parent_name = self.__parent_name() if private else missing
+        if parent_name is not missing:
+            d['__parent'] = parent_name
         return d
 
-    def format_string(self, value, sub_attributes=None):
+    def raw_items(self, private=True):
+        # the items of to_dict(private), without copying anything: nested values are yielded as stored
+        parent_name = self.__parent_name() if private else missing
+        for key, value in self.__config_dict.items():
+            if key[:2] != '__' or private:
+                if parent_name is not missing and key == '__parent':
+                    value = parent_name
+                elif key in self.__raw_keys:
+                    value = self.__expand_dotted(value)
+                yield key, value
+        if parent_name is not missing and '__parent' not in self.__config_dict:
+            yield '__parent', parent_name
+
+    def share(self, pool, root=False):
+        # Replaces every nested config by an identical one already in pool, and returns self, or the pooled
+        # equivalent of self when root is set. Pooled configs are read-only: they are copied on write when they
+        # are modified through a config holding them.
+        key = self.__share_key(pool)
+        if not root or self.__parent_loader is not None:
+            return self
+        return self.__adopt(pool, key + (id(self.__parent),))
+
+    def freeze(self):
+        parent = self.__parent.freeze() if self.__get_parent() is not None else None
+        items = ((key, self.__freeze_value(self.__get_value(key))) for key in self.__config_dict)
+        return ConfigSnapshot.from_items(items, parent, self.get_name())
+
+    @timed('prefetch')
+    def prefetch(self):
+        calls = self.__executor_calls()
+        for executor, arguments in calls.items():
+            self.__store_prefetched(executor, arguments, executor.execute_many(arguments))
+        return self
+
+    @timed('prefetch')
+    async def prefetch_async(self, asynchronous_only=False):
+        # a lazy parent is left unloaded when only the asynchronous values are fetched
+        calls = self.__executor_calls(loaded_only=asynchronous_only)
+        if asynchronous_only:
+            # the others are fetched on access, like without prefetch
+            calls = {executor: arguments for executor, arguments in calls.items() if executor.asynchronous}
+        results = await asyncio.gather(*(executor.execute_many_async(arguments)
+                                         for executor, arguments in calls.items()))
+        for (executor, arguments), result in zip(calls.items(), results):
+            self.__store_prefetched(executor, arguments, result)
+        return self
+
+    def format_string(self, value, sub_attributes=None, template=None):
         try:
-            value = self.__format_string(value)
+            value = (template or Template(value)).render(self.__lookup, self.__execute)
         except RecursionError:
             raise ReinterpretationError(sub_attributes, value, 'Due to cycle - RecursionError', RecursionError)
         except KeyError as e:
             raise ReinterpretationError(sub_attributes, value,
-                                        f"Could not find param {e} in FstringConfig", KeyError)
+                                        f"Could not find param {e} in {self.get_name() or 'config'}",
+                                        KeyError)
         except FormatExecutorError as e:
             raise ReinterpretationError(sub_attributes, value, e.msg, e.type_)
 
         return value
 
+    def validate(self):
+        done = set()
+        for node in self.__template_nodes():
+            if (id(node[0]), node[1]) in done:
+                continue
+            path = [(node, node[1], node[0].__reference_targets(node[1]))]
+            active = {(id(node[0]), node[1])}
+            while path:
+                target = next(path[-1][2], None)
+                if target is None:
+                    (config, key), _, _ = path.pop()
+                    active.remove((id(config), key))
+                    done.add((id(config), key))
+                    continue
+                (config, key), label = target
+                if (id(config), key) in active:
+                    cycle = ' -> '.join([label for _, label, _ in path] + [label])
+                    raise ReinterpretationError(key, config.__config_dict[key], f'Due to cycle: {cycle}',
+                                                RecursionError)
+                if (id(config), key) not in done:
+                    active.add((id(config), key))
+                    path.append(((config, key), label, config.__reference_targets(key)))
+        return self
+
+    def accessor(self, key):
+        # a getter for key that splits it only once, for lookups repeated in hot loops
+        *prefix, name = (sys.intern(part) for part in self.__get_path_parts(key))
+        prefix = tuple(prefix)
+
+        def get():
+            value = self.__get_path(prefix, name, private=True)
+            if value is missing:
+                raise KeyError(f"Could not find param '{key}' in {self.get_name() or 'config'}")
+            return value
+        return get
+
+    def get_many(self, keys):
+        # a tuple of the values of keys, or a {name: value} dict when keys maps keys to names. Keys are resolved
+        # in one pass: the nodes a prefix leads to ( db.primary in db.primary.host and db.primary.port ), in self
+        # and its parents, are looked up once for all the keys sharing it
+        frames, chains, values = stack.frames, dict(), []
+        for key in keys:
+            if not isinstance(key, str):
+                raise TypeError('Key should be of type str')
+            prefix, _, name = key.rpartition('.')
+            chain = chains.get(prefix)
+            if chain is None:
+                chain = chains[prefix] = self.__get_chain(prefix, frames)
+            for node in chain:
+                value = node.__config_dict.get(name, missing)
+                if value is not missing:
+                    # plain values are read directly, anything to record, materialize or resolve goes through
+                    # __get_value
+                    if frames or name in node.__raw_keys or isinstance(value, str) and '${' in value:
+                        value = node.__get_value(name)
+                    values.append(value)
+                    break
+                if frames:
+                    frames[-1].reads.append((node, name))
+            else:
+                raise KeyError(f"Could not find param '{key}' in {self.get_name() or 'config'}")
+        return {name: value for name, value in zip(keys.values(), values)} if isinstance(keys, dict) else tuple(values)
+
     def get_raw(self, key, private=False):
         return self.__get_value(key, raw=True, private=private)
 
-    def __set_value(self, key, value, private=True):
-        new_key = self.__parse_key(key)
-        if not private and key != new_key:
+    def __setup(self, context, lazy):
+        # internal slots are set without going through __setattr__, which sets config keys
+        setattr_ = object.__setattr__
+        setattr_(self, '_Config__context', context)
+        setattr_(self, '_Config__lazy', lazy)
+        setattr_(self, '_Config__named', False)
+        setattr_(self, '_Config__shared', None)
+        setattr_(self, '_Config__keys', None)
+        setattr_(self, '_Config__config_dict', dict())
+        setattr_(self, '_Config__templates', self.__no_items)
+        setattr_(self, '_Config__resolved', self.__no_items)
+        setattr_(self, '_Config__dependents', self.__no_items)
+        setattr_(self, '_Config__prefetched', self.__no_items)
+        setattr_(self, '_Config__raw_keys', self.__no_keys)
+
+    def __set_parent(self, parent):
+        if callable(parent):
+            object.__setattr__(self, '_Config__parent', None)
+            object.__setattr__(self, '_Config__parent_loader', parent)
+        else:
+            object.__setattr__(self, '_Config__parent', parent)
+            object.__setattr__(self, '_Config__parent_loader', None)
+
+    def __fill(self, config_dict, name, type_, lazy):
+        if config_dict and lazy:
+            for key, value in config_dict.items():
+                self.__set_single_item(key, value, private=True, lazy=True)
+        elif config_dict:
+            self.update(config_dict)
+
+        # Meta data
+        if name:
+            self.__set_single_item('__name', name, private=True)
+            object.__setattr__(self, '_Config__named', True)
+
+        if type_:
+            self.__set_single_item('__type', type_, private=True)
+
+    def __child(self, config_dict, name=None, lazy=False):
+        child = Config.__new__(Config)
+        child.__setup(self.__context, lazy)
+        child.__set_parent(None)
+        child.__fill(config_dict, name, None, lazy)
+        return child
+
+    def __set_value(self, key, value, private=True, lazy=False):
+        if not private and key[:2] == '__':
             raise ValueError('Trying to set private parameter')
-        value = self.__parse_value(value)
-        self.__config_dict[new_key] = value
+        self.__check_writable(key)
+        # keys repeat across every node of a tree: interned, each of them is stored once
+        key = sys.intern(key)
+        if lazy and (type(value) == dict or type(value) == list):
+            # kept as parsed until first accessed, see __materialize
+            if self.__raw_keys is self.__no_keys:
+                object.__setattr__(self, '_Config__raw_keys', set())
+            self.__raw_keys.add(key)
+        else:
+            if key in self.__raw_keys:
+                self.__raw_keys.discard(key)
+            value = self.__parse_value(value)
+        if self.__keys is not None and key and key[:2] != '__':
+            self.__index_key(key, self)
+        self.__config_dict[key] = value
+        self.__templates.pop(key, None)
+        self.__invalidate(key)
         return value
 
     def __get_value(self, key, raw=False, private=True):
-        key = self.__parse_key(key) if private else key
+        if not private and key[:2] == '__':
+            raise KeyError(key)
+        frames = stack.frames
+        if frames:
+            frames[-1].reads.append((self, key))
         value = self.__config_dict[key]
-        if not raw and isinstance(value, str):
-            value = self.format_string(value, key)
+        if key in self.__raw_keys:
+            value = self.__materialize(key)
+        if not raw and isinstance(value, str) and '${' in value:
+            try:
+                return self.__resolved[key]
+            except KeyError:
+                return self.__resolve(key, value)
         return value
 
-    def __get_single_item(self, key, private):
+    @timed('interpolation', 'key')
+    def __resolve(self, key, value):
+        template = self.__get_template(key, value)
+        if template.constant:
+            return value
+        frames = stack.frames
+        frame = Frame(self, key, stack.reference if frames else key)
+        if not stack.push(frame):
+            cycle = stack.cycle_path(frame.label)
+            raise ReinterpretationError(key, value, f'Due to cycle: {cycle}', RecursionError)
         try:
-            return self.__get_single_local_item(key, private)
-        except KeyError as e:
-            if self.__parent:
-                try:
-                    return self.__parent.__get_single_local_item(key, private)
-                except KeyError:
-                    pass
-            raise KeyError(f'Could not find param {e} in {self.__name if self.__name else "config"}')
-
-    def __get_single_local_item(self, sub_attributes, private):
+            value = self.format_string(value, key, template)
+        finally:
+            stack.pop()
+        if frame.volatile:
+            if frames:
+                frames[-1].volatile = True
+        else:
+            if self.__resolved is self.__no_items:
+                object.__setattr__(self, '_Config__resolved', dict())
+            self.__resolved[key] = value
+            for config, dependency in frame.reads:
+                config.__add_dependent(dependency, self, key)
+        return value
+
+    def __get_parent(self):
+        if self.__parent_loader is not None:
+            self.__set_parent(self.__parent_loader())
+        return self.__parent
+
+    def __parent_name(self):
+        # the name of the parent, or missing without one. A lazy parent is not loaded when its loader has the name
+        # of the config it returns, as ConfigManager's have: to_dict is the same before and after it is loaded
+        name = getattr(self.__parent_loader, 'name', missing)
+        if name is not missing:
+            return name
+        parent = self.__get_parent()
+        return missing if parent is None else parent.get_name()
+
+    def __materialize(self, key):
+        value = self.__config_dict[key]
+        if key in self.__raw_keys:
+            value = self.__config_dict[key] = self.__parse_value(value, lazy=True)
+            self.__raw_keys.discard(key)
+        return value
+
+    def __lookup(self, key):
+        reference, stack.reference = stack.reference, key
+        try:
+            value = self[key]
+        finally:
+            stack.reference = reference
+        if isinstance(value, (Config, list)):
+            # str() of a mutable container can change without any of its keys being set through self
+            self.__mark_volatile()
+        return value
+
+    @timed('executor', 'name', 'argument')
+    def __execute(self, name, argument):
+        # Executor results (environment variables, file contents...) are never memoized: any value
+        # that depends on one is rendered again on every access, so changes are always visible.
+        # Executors registered with a ttl cache their own results, and results gathered by prefetch
+        # are kept until the next prefetch.
+        self.__mark_volatile()
+        try:
+            return self.__prefetched[(name, argument)]
+        except KeyError:
+            return self.__context[2][name][argument]
+
+    @staticmethod
+    def __mark_volatile():
+        frames = stack.frames
+        if frames:
+            frames[-1].volatile = True
+
+    def __add_dependent(self, key, config, dependent_key):
+        dependents = self.__dependents.get(key)
+        if dependents is None:
+            if self.__dependents is self.__no_items:
+                object.__setattr__(self, '_Config__dependents', dict())
+            dependents = self.__dependents[key] = dict()
+        dependents[(id(config), dependent_key)] = (weakref.ref(config), dependent_key)
+
+    def __invalidate(self, key):
+        self.__resolved.pop(key, None)
+        dependents = self.__dependents.pop(key, None)
+        if dependents:
+            for reference, dependent_key in dependents.values():
+                config = reference()
+                if config is not None:
+                    config.__invalidate(dependent_key)
+
+    def __template_nodes(self, loaded_only=False):
+        for key in list(self.__raw_keys):
+            self.__materialize(key)
+        for key, value in self.__config_dict.items():
+            if isinstance(value, str) and not self.__get_template(key, value).constant:
+                yield self, key
+            else:
+                for config in self.__sub_configs(value):
+                    yield from config.__template_nodes(loaded_only)
+        if loaded_only and self.__parent_loader is not None:
+            return
+        if self.__get_parent() is not None:
+            yield from self.__parent.__template_nodes(loaded_only)
+
+    def __executor_calls(self, loaded_only=False):
+        # executor -> argument -> [(config, executor name)], every argument is fetched once per executor
+        calls = dict()
+        for config, key in self.__template_nodes(loaded_only):
+            object.__setattr__(config, '_Config__prefetched', dict())
+            for reference in config.__get_template(key, config.__config_dict[key]).references:
+                executor = config.__context[2].get(reference.executor)
+                if executor is not None:
+                    calls.setdefault(executor, dict()).setdefault(reference.argument, []).append(
+                        (config, reference.executor))
+        return calls
+
+    @staticmethod
+    def __store_prefetched(executor, arguments, results):
+        if executor.ttl:
+            # already cached by the executor itself
+            return
+        for argument, users in arguments.items():
+            if argument in results:
+                for config, name in users:
+                    config.__prefetched[(name, argument)] = results[argument]
+
+    @classmethod
+    def __sub_configs(cls, value):
+        if type(value) == Config:
+            yield value
+        elif isinstance(value, list):
+            for item in value:
+                yield from cls.__sub_configs(item)
+
+    def __reference_targets(self, key):
+        value = self.__config_dict[key]
+        for reference in self.__get_template(key, value).references:
+            try:
+                config, target = self.__locate(reference.key)
+            except KeyError:
+                if reference.executor is not None and reference.executor in self.__context[2]:
+                    continue
+                raise ReinterpretationError(key, value, f"Could not find param '{reference.key}' in "
+                                                        f"{self.get_name() or 'config'}", KeyError)
+            if isinstance(config.__config_dict[target], str):
+                yield (config, target), reference.key
+
+    def __locate(self, sub_attributes):
+        config = self
+        while True:
+            try:
+                return config.__locate_local(sub_attributes)
+            except KeyError:
+                config = config.__get_parent()
+                if config is None:
+                    raise
+
+    def __visible_keys(self):
+        # key -> config holding it, for every key iteration yields, parents included. Kept up to date by
+        # __set_value and __del_single_item, and rebuilt only when a parent's index changed.
+        index = self.__keys
+        parent = self.__parent if self.__parent_loader is None else self.__get_parent()
+        parent_keys = parent.__visible_keys() if parent is not None else None
+        parent_version = parent.__keys[1] if parent is not None else None
+        if index is None or index[2] != parent_version:
+            keys = {key: self for key in self.__config_dict if key and key[:2] != '__'}
+            if parent_keys:
+                for key, config in parent_keys.items():
+                    keys.setdefault(key, config)
+            index = [keys, next(versions), parent_version]
+            object.__setattr__(self, '_Config__keys', index)
+        return index[0]
+
+    def __index_key(self, key, config):
+        keys = self.__keys[0]
+        if config is None:
+            keys.pop(key, None)
+        elif keys.get(key) is config:
+            return
+        else:
+            keys[key] = config
+        self.__keys[1] = next(versions)
+
+    def __iter_items(self):
+        for key, config in self.__visible_keys().items():
+            yield key, config.__get_value(key)
+
+    def __locate_local(self, sub_attributes):
         sub_attributes = self.__get_sub_attributes_list(sub_attributes)
+        key = sub_attributes[0]
+        value = self.__materialize(key)
         if len(sub_attributes) == 1:
-            return self.__get_value(sub_attributes[0], raw=False, private=private)
-        else:
-            conf = self.__get_value(sub_attributes[0], raw=True, private=private)
-            return conf.__get_single_local_item(sub_attributes[1], private)
+            return self, key
+        elif type(value) == Config:
+            return value.__locate_local(sub_attributes[1])
+        raise KeyError(sub_attributes[1])
 
-    def __set_single_item(self, sub_attributes, value, private):
+    def __get_template(self, key, value):
+        template = self.__templates.get(key)
+        if template is None:
+            if self.__templates is self.__no_items:
+                object.__setattr__(self, '_Config__templates', dict())
+            template = self.__templates[key] = Template(value)
+        return template
+
+    def __get_single_item(self, key, private):
+        *prefix, name = self.__get_path_parts(key)
+        value = self.__get_path(prefix, name, private)
+        if value is missing:
+            raise KeyError(f"Could not find param '{key}' in {self.get_name() or 'config'}")
+        return value
+
+    def __get_path(self, prefix, key, private):
+        # the value of a dotted key split in prefix and key, from self or the first parent holding it, or missing
+        config, frames = self, stack.frames
+        while config is not None:
+            node = config.__get_node(prefix, private, frames) if prefix else config
+            if node is not None:
+                if key in node.__config_dict and (private or key[:2] != '__'):
+                    return node.__get_value(key)
+                if frames:
+                    # setting the key later shadows the parent's value: it is a dependency too
+                    frames[-1].reads.append((node, key))
+            config = config.__parent if config.__parent_loader is None else config.__get_parent()
+        return missing
+
+    def __get_chain(self, prefix, frames):
+        # the nodes a dotted prefix leads to in self and each of its parents, in lookup order
+        prefix, chain, config = prefix.split('.') if prefix else (), [], self
+        while config is not None:
+            node = config.__get_node(prefix, True, frames) if prefix else config
+            if node is not None:
+                chain.append(node)
+            config = config.__parent if config.__parent_loader is None else config.__get_parent()
+        return chain
+
+    def __get_node(self, prefix, private, frames):
+        # the nested config a prefix leads to, or None
+        node = self
+        for key in prefix:
+            if frames:
+                frames[-1].reads.append((node, key))
+            value = node.__config_dict.get(key)
+            if value is None or not private and key[:2] == '__':
+                return None
+            if key in node.__raw_keys:
+                value = node.__materialize(key)
+            if type(value) is not Config:
+                return None
+            node = value
+        return node
+
+    def __set_single_item(self, sub_attributes, value, private, lazy=False):
         sub_attributes = self.__get_sub_attributes_list(sub_attributes)
         if len(sub_attributes) == 1:
-            return self.__set_value(sub_attributes[0], value, private=private)
+            return self.__set_value(sub_attributes[0], value, private=private, lazy=lazy)
         else:
             try:
                 conf = self.__get_value(sub_attributes[0], raw=True, private=private)
             except KeyError:
-                conf = self.__set_value(sub_attributes[0], Config(dict()), private=private)
-            conf.__set_single_item(sub_attributes[1], value, private)
+                conf = self.__set_value(sub_attributes[0], self.__parse_value(dict(), lazy=self.__lazy),
+                                        private=private)
+            if type(conf) is Config and conf.__shared:
+                conf = self.__set_value(sub_attributes[0], conf.__copy(), private=private)
+            conf.__set_single_item(sub_attributes[1], value, private, lazy)
+
+    def __del_single_item(self, sub_attributes):
+        sub_attributes = self.__get_sub_attributes_list(sub_attributes)
+        if len(sub_attributes) == 2:
+            conf = self.__get_value(sub_attributes[0], raw=True)
+            if type(conf) is not Config:
+                raise KeyError(sub_attributes[1])
+            if conf.__shared:
+                conf = self.__set_value(sub_attributes[0], conf.__copy())
+            return conf.__del_single_item(sub_attributes[1])
+        key = sub_attributes[0]
+        self.__check_writable(key)
+        del self.__config_dict[key]
+        if self.__keys is not None and key in self.__keys[0]:
+            parent = self.__parent
+            self.__index_key(key, parent.__visible_keys().get(key) if parent is not None else None)
+        if key in self.__raw_keys:
+            self.__raw_keys.discard(key)
+        self.__templates.pop(key, None)
+        self.__invalidate(key)
+
+    def __share_key(self, pool):
+        for key in list(self.__raw_keys):
+            self.__materialize(key)
+        items = []
+        for key, value in self.__config_dict.items():
+            self.__config_dict[key], value_key = self.__share_value(value, pool)
+            items.append((key, value_key))
+        registry, path, bound = self.__context
+        # executors are bound per directory: configs of the same directory resolve alike
+        return id(registry), path, id(bound), self.__named, tuple(items)
+
+    @classmethod
+    def __share_value(cls, value, pool):
+        if type(value) is Config:
+            value = value.__adopt(pool, value.__share_key(pool))
+            # pooled children live as long as the configs holding them, their id identifies them
+            return value, id(value)
+        elif type(value) is list:
+            keys = []
+            for i, item in enumerate(value):
+                value[i], item_key = cls.__share_value(item, pool)
+                keys.append(item_key)
+            return value, (list, tuple(keys))
+        elif type(value) is str:
+            value = pool.string(value)
+            return value, value
+        try:
+            hash(value)
+        except TypeError:
+            return value, (object, id(value))
+        return value, (type(value), value)
+
+    def __adopt(self, pool, key):
+        shared = pool.adopt(key, self, self.__footprint)
+        if shared.__shared is None:
+            object.__setattr__(shared, '_Config__shared', (pool, key))
+        return shared
+
+    def __check_writable(self, key):
+        if self.__shared:
+            raise TypeError(f"Cannot modify '{key}': this config is shared by identical configs "
+                            f"( ConfigManager.share ), modify it through the config holding it")
+
+    def __copy(self):
+        copy = Config.__new__(Config)
+        copy.__setup(self.__context, self.__lazy)
+        copy.__set_parent(self.__parent_loader or self.__parent)
+        object.__setattr__(copy, '_Config__named', self.__named)
+        object.__setattr__(copy, '_Config__config_dict',
+                           {key: self.__copy_value(value) for key, value in self.__config_dict.items()})
+        return copy
+
+    @classmethod
+    def __copy_value(cls, value):
+        # nested configs stay shared until they are modified, lists belong to a single config
+        return [cls.__copy_value(item) for item in value] if type(value) is list else value
+
+    def __footprint(self):
+        # what a duplicate costs once its nested configs and strings are shared: the node, its dict and its lists
+        return sys.getsizeof(self) + sys.getsizeof(self.__config_dict) + sum(
+            self.__list_footprint(value) for value in self.__config_dict.values())
+
+    @classmethod
+    def __list_footprint(cls, value):
+        if type(value) is not list:
+            return 0
+        return sys.getsizeof(value) + sum(cls.__list_footprint(item) for item in value)
+
+    @staticmethod
+    def __get_path_parts(key):
+        if not isinstance(key, str):
+            raise TypeError('Key should be of type str')
+        return key.split('.')
 
     @staticmethod
     def __get_sub_attributes_list(sub_attributes):
@@ -118,21 +655,6 @@ class Config(MutableMapping):
             raise TypeError('Key should be of type str')
         return sub_attributes
 
-    def __format_string(self, text):
-        return re.sub(self.__c_regex, self.__get_format_value, text)
-
-    def __get_format_value(self, match):
-        try:
-            return str(self[match.group(1)])
-        except KeyError:
-            if re.fullmatch(self.__c_fe_regex, match.group(0)):
-                try:
-                    return re.sub(self.__c_fe_regex,
-                                  lambda m: str(self.__format_exec[m.group(1)][m.group(2)]), match.group(0))
-                except KeyError:
-                    pass
-            raise KeyError(match.group(1))
-
     def __repr__(self):
         return f"Config: {self.to_dict(private=True, include_parent=False)}"
 
@@ -140,10 +662,9 @@ class Config(MutableMapping):
         return str(self.to_dict(private=False, include_parent=False))
 
     def __getattr__(self, item):
-        try:
-            return self.__get_single_item(item, private=False)
-        except KeyError:
-            return self.__getattribute__(item)
+        *prefix, key = self.__get_path_parts(item)
+        value = self.__get_path(prefix, key, private=False)
+        return self.__getattribute__(item) if value is missing else value
 
     def __setattr__(self, key, value):
         if not key.startswith(self.__private_prefix):
@@ -152,10 +673,13 @@ class Config(MutableMapping):
             return super(Config, self).__setattr__(key, value)
 
     def __getitem__(self, k):
-        if isinstance(k, dict):
-            return Config({name: self[key] for key, name in k.items()})
+        if type(k) is str:
+            return self.__get_single_item(k, private=True)
+        elif isinstance(k, dict):
+            return Config(self.get_many(k))
         elif not (isinstance(k, str)) and hasattr(k, '__iter__'):
-            return Config({key: self[key] for key in k})
+            k = list(k)
+            return Config(dict(zip(k, self.get_many(k))))
 
         return self.__get_single_item(k, private=True)
 
@@ -163,27 +687,65 @@ class Config(MutableMapping):
         self.__set_single_item(k, v, private=True)
 
     def __delitem__(self, v) -> None:
-        del self.__config_dict[v]
+        self.__del_single_item(v)
 
     def __len__(self):
-        return len(self.__config_dict)
+        return len(self.__visible_keys())
 
     def __iter__(self):
-        keys = {key for key in self.__config_dict if key and not key.startswith(self.__private_prefix)}
-        if self.__parent:
-            keys.update(self.__parent)
-        return iter(keys)
+        return iter(self.__visible_keys())
+
+    def __contains__(self, k):
+        if type(k) is str and '.' not in k and k[:2] != '__':
+            return k in self.__visible_keys()
+        return super().__contains__(k)
+
+    def items(self):
+        return ConfigItems(self, self.__iter_items)
 
     __private_prefix = f'_{__qualname__}'
 
-    @classmethod
-    def __parse_value(cls, value, name=None):
+    def __parse_value(self, value, name=None, lazy=False):
         if type(value) == dict:
-            return Config(value, name=name)
+            return self.__child(value, name, lazy)
         elif type(value) == Config:
             return value
         elif not (isinstance(value, str)) and hasattr(value, '__iter__'):
-            return [cls.__parse_value(p) for p in value]
+            return [self.__parse_value(p, lazy=lazy) for p in value]
+        return value
+
+    @classmethod
+    def __freeze_value(cls, value):
+        if type(value) == Config:
+            return value.freeze()
+        elif isinstance(value, list):
+            return tuple(cls.__freeze_value(item) for item in value)
+        return value
+
+    @classmethod
+    def __expand_dotted(cls, value):
+        # a subtree that was never materialized, with its dotted keys nested as setting them would ( {'a.b': 1} is
+        # {'a': {'b': 1}} ). value itself when it has none, copied as far as needed otherwise
+        if type(value) == dict:
+            items = [(key, cls.__expand_dotted(item)) for key, item in value.items()]
+            if all(item is value[key] and '.' not in key for key, item in items):
+                return value
+            # parsed dicts are never modified: those a dotted key goes through are copied first
+            expanded, copies = dict(), set()
+            for key, item in items:
+                *path, key = key.split('.')
+                node = expanded
+                for part in path:
+                    child = node.get(part)
+                    if type(child) is not dict or id(child) not in copies:
+                        child = node[part] = dict(child) if type(child) is dict else dict()
+                        copies.add(id(child))
+                    node = child
+                node[key] = item
+            return expanded
+        elif type(value) == list:
+            items = [cls.__expand_dotted(item) for item in value]
+            return value if all(item is original for item, original in zip(items, value)) else items
         return value
 
     @classmethod
@@ -192,16 +754,12 @@ class Config(MutableMapping):
             private = args.get('private', True)
             include_parent = args.get('include_parent', False)
             return value.to_dict(private=private, include_parent=include_parent)
+        elif type(value) == dict:
+            # a subtree that was never materialized (see Config.__materialize)
+            private = args.get('private', True)
+            return {k: cls.__reverse_parse_value(v, private=private) for k, v in cls.__expand_dotted(value).items()
+                    if private or k[:2] != '__'}
         elif not (isinstance(value, str)) and hasattr(value, '__iter__'):
             return [cls.__reverse_parse_value(p) for p in value]
         return value
 
-    @classmethod
-    def __parse_key(cls, key):
-        return f'{cls.__private_prefix}{key}' if key[:2] == '__' else key
-
-    @classmethod
-    def __reverse_parse_key(cls, key):
-        n = len(cls.__private_prefix)
-        return key[n:] if key.startswith(cls.__private_prefix) else key
-
@@ -1,11 +1,31 @@
+import asyncio
+import contextvars
+import hashlib
+import inspect
 import os
+import stat as stat_module
 import sys
+import threading
+import time
 
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import suppress, contextmanager
+from functools import partial
 from itertools import chain
 from pathlib import Path
 
 from configDmanager import Config
-from configDmanager.errors import ConfigNotFoundError, ConfigManagerError
+from configDmanager import _binary as binary
+from configDmanager._instrument import instrumentation, timed
+from configDmanager._format import FileReader, FrozenExecutor, ExecutorRegistry, format_executors
+from configDmanager._watch import Watch, scheduler, diff_keys, dependent_keys, get_path, missing, file_signature, \
+    template_references
+from configDmanager._cache import LRUCache
+from configDmanager._sharing import SharingPool
+from configDmanager._shared import SharedPublisher, SharedConfig
+from configDmanager._template import Template
+from configDmanager._transaction import Transaction
+from configDmanager.errors import ConfigNotFoundError, ConfigManagerError, ConfigImportError
 from configDmanager.config_types import JsonType, YamlType
 
 
@@ -14,16 +34,157 @@ class ConfigManager:
                        'yml': YamlType,
                        'yaml': YamlType}
     default_export_type = 'json'
+    cache_size = 0
+    lazy = False
+    lazy_parent = False
+    prefetch = False
+    compiled_cache = False
+    share = False
+    compiled_cache_dir = None
+    executors = ExecutorRegistry(format_executors)
+    watch_interval = 1.0
+    watch_backend = 'auto'
+    __cache = LRUCache()
+    __directories = LRUCache(maxsize=1024)
+    __locations = LRUCache(maxsize=1024)
+    __racy_window = 2 * 10 ** 9
+    __sniff_size = 1024  # characters read to guess the type of a file, see __detect_type
+    __pinned = dict()
+    __compiled_directory = '__configcache__'
+    __pool = SharingPool()
+    # per thread and per asyncio task: concurrent tasks on one loop never join each other's transaction
+    __transactions = contextvars.ContextVar('configDmanager transaction', default=None)
+    __bundled = dict()
+    instrumentation = instrumentation
 
     @classmethod
-    def import_config(cls, name, path=None, type_=None):
+    @timed('import', 'name', 'path')
+    def import_config(cls, name, path=None, type_=None, prefetch=None):
+        config = cls.__from_bundle(name, path, type_)
+        if config is None:
+            config = cls.__import(name, path, type_)
+        return config.prefetch() if (cls.prefetch if prefetch is None else prefetch) else config
+
+    @classmethod
+    def import_configs(cls, names, path=None, type_=None, max_workers=None):
+        configs, errors, files, requested = dict(), dict(), dict(), dict()
+        with ThreadPoolExecutor(max_workers) as executor:
+            def submit(name, c_path, c_type):
+                level, c_path = cls.__level_parse(name, c_path)
+                location = next(cls.__search(name[level:], c_path, level, c_type), None)
+                if location is None:
+                    raise ConfigNotFoundError(name[level:], c_path)
+                key = (os.path.abspath(location[1]), location[0], c_type.lower() if c_type else None)
+                if key not in files:
+                    files[key] = (location, c_type, executor.submit(cls.__read_config_file, *location, c_type))
+                return key
+
+            for name in names:
+                configs[name] = cls.__from_bundle(name, path, type_)
+                if configs[name] is not None:
+                    continue
+                try:
+                    requested[name] = submit(name, path, type_)
+                except Exception as e:
+                    errors[name] = e
+            # parents are only known once their child is parsed: submit them as results come in, unless they are
+            # loaded lazily, see build
+            parents, queued = dict(), set(files)
+            pending = {future: key for key, (_, _, future) in files.items()} if not cls.lazy_parent else dict()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = pending.pop(future)
+                    if future.exception() is not None or not future.result().get('__parent'):
+                        continue
+                    config_dict, c_path = future.result(), files[key][0][1]
+                    try:
+                        parents[key] = parent_key = submit(config_dict['__parent'],
+                                                           config_dict.get('__parent_path', c_path),
+                                                           config_dict.get('__parent_type'))
+                    except Exception as e:
+                        parents[key] = e
+                        continue
+                    if parent_key not in queued:
+                        queued.add(parent_key)
+                        pending[files[parent_key][2]] = parent_key
+
+        def build(key, chain_=()):
+            # like import_config, every config gets parents of its own: only parsed files are shared
+            if key in chain_:
+                raise ConfigManagerError(f'Cycle in parent configs: {" -> ".join(k[1] for k in chain_ + (key,))}')
+            (config_name, c_path), c_type, future = files[key]
+            config_dict = future.result()
+            if cls.lazy_parent:
+                return cls.__load_config(config_dict, config_name, c_path, c_type)
+            parent = parents.get(key)
+            if isinstance(parent, Exception):
+                raise parent
+            parent = build(parent, chain_ + (key,)) if parent is not None else None
+            if parent is not None and cls.share:
+                parent = parent.share(cls.__pool, root=True)
+            config = Config(config_dict, parent, config_name, c_path, c_type, lazy=cls.lazy, executors=cls.executors)
+            return config.share(cls.__pool) if cls.share else config
+
+        for name, key in requested.items():
+            try:
+                configs[name] = build(key)
+            except Exception as e:
+                errors[name] = e
+        # in the order of names, bundled ones included
+        configs = {name: config for name, config in configs.items() if config is not None}
+        if cls.prefetch:
+            for name, config in configs.items():
+                try:
+                    config.prefetch()
+                except Exception as e:
+                    errors[name] = e
+        if errors:
+            raise ConfigImportError(errors, configs)
+        return configs
+
+    @classmethod
+    @timed('import', 'name', 'path')
+    async def import_config_async(cls, name, path=None, type_=None, prefetch=None):
+        # like import_config, the values of executors are only prefetched with prefetch, except for asynchronous
+        # executors which can not be called on access
+        config = cls.__from_bundle(name, path, type_)
+        if config is None:
+            level, path = cls.__level_parse(name, path)
+            config = (await cls.__config_import_async(name[level:], path, level, type_))[0]
+        await config.prefetch_async(asynchronous_only=not (cls.prefetch if prefetch is None else prefetch))
+        return config
+
+    @classmethod
+    async def update_config_async(cls, mod, name, path=None, type_=None):
         level, path = cls.__level_parse(name, path)
-        return cls.__config_import(name[level:], path, level, type_)[0]
+        staged = cls.__staged(name[level:], path, level, type_)
+        config, name_base, c_path = staged or await cls.__config_import_async(name[level:], path, level, type_)
+        await config.prefetch_async(asynchronous_only=not cls.prefetch)
+        if callable(mod) and not isinstance(mod, Config):
+            mod = mod(config)
+            if inspect.isawaitable(mod):
+                mod = await mod
+        if isinstance(mod, dict) or isinstance(mod, Config):
+            config.update(mod)
+        else:
+            raise ValueError('mod must be a dict, Config or a callable that returns a dict or a Config')
+        await cls.export_config_async(config, name_base, c_path, type_)
+        return config
+
+    @classmethod
+    async def export_config_async(cls, config, name, path=None, type_=None):
+        if cls.__transaction() is not None:
+            # only staged until the transaction ends
+            return cls.export_config(config, name, path, type_)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(cls.export_config, config, name, path, type_))
 
     @classmethod
     def update_config(cls, mod, name, path=None, type_=None):
         level, path = cls.__level_parse(name, path)
-        config, name_base, c_path = cls.__config_import(name[level:], path, level, type_)
+        staged = cls.__staged(name[level:], path, level, type_)
+        config, name_base, c_path = staged or cls.__config_import(name[level:], path, level, type_)
         if isinstance(mod, dict) or isinstance(mod, Config):
             config.update(mod)
         elif callable(mod):
@@ -38,83 +199,691 @@ class ConfigManager:
         level, path = cls.__level_parse(name, path)
         return cls.__config_export(config, name[level:], path, level, type_)
 
+    @classmethod
+    @contextmanager
+    def transaction(cls, lock=False):
+        current = cls.__transactions.get()
+        if current is not None:
+            yield current
+            return
+        transaction = Transaction(lock)
+        token = cls.__transactions.set(transaction)
+        try:
+            yield transaction
+            cls.__transactions.set(None)
+            transaction.commit()
+        finally:
+            cls.__transactions.reset(token)
+            transaction.release()
+
+    @classmethod
+    def locate(cls, name, path=None, type_=None):
+        level, path = cls.__level_parse(name, path)
+        return cls.__locate_file(name[level:], path, level, type_)
+
+    @classmethod
+    def watch(cls, name, callback, path=None, type_=None):
+        level, path = cls.__level_parse(name, path)
+        config = cls.__config_import(name[level:], path, level, type_)[0]
+        if cls.prefetch:
+            config.prefetch()
+        watch = Watch(config, callback, partial(cls.__refresh_watch, name[level:], path, level, type_),
+                      cls.__release_watch)
+        cls.__track_watch(watch, name[level:], path, level, type_)
+        scheduler.add(watch, cls.watch_interval, cls.watch_backend)
+        return watch
+
+    @classmethod
+    def stats(cls):
+        return cls.instrumentation.stats()
+
+    @classmethod
+    def sharing_report(cls):
+        return cls.__pool.report()
+
+    @classmethod
+    def clear_cache(cls):
+        cls.__cache.clear()
+
+    @classmethod
+    def cache_info(cls):
+        return cls.__cache.info()
+
+    @classmethod
+    def compile_tree(cls, path, cache_dir=None):
+        compiled = []
+        cache_dir = cache_dir or cls.compiled_cache_dir
+        for directory, directories, files in os.walk(path):
+            directories[:] = [d for d in directories if d != cls.__compiled_directory]
+            for file_name in files:
+                type_ = os.path.splitext(file_name)[1][1:].lower()
+                if type_ not in cls.supported_types or not cls.supported_types[type_].compiled:
+                    continue
+                config_path = os.path.join(directory, file_name)
+                stat, text = cls.__read_text(config_path)
+                config_dict = cls.supported_types[type_].loads(text)
+                if isinstance(config_dict, dict) and cls.__write_compiled(config_path, type_, stat, text, config_dict,
+                                                                          cache_dir):
+                    compiled.append(config_path)
+        return compiled
+
+    @classmethod
+    def bundle(cls, names, output, path=None, type_=None, freeze=()):
+        # Every config of names with its parents, as found now, in one binary file read by load_bundle.
+        # The current results of the executors named in freeze are stored with it, and used instead of them.
+        files, configs = dict(), []
+        for name in names:
+            configs.append([name, str(path) if path else None, type_, cls.__bundle_file(name, path, type_, files,
+                                                                                         set(freeze))])
+        try:
+            data = binary.dumps({'configs': configs, 'files': files},
+                                binary.Header('bundle', time.time_ns(), len(configs), binary.digest(repr(configs)),
+                                              kind=binary.BUNDLE))
+        except TypeError as e:
+            raise ConfigManagerError(f'Could not bundle {", ".join(names)}: {e}') from None
+        temp_path = f'{output}.{os.getpid()}.tmp'
+        try:
+            with open(temp_path, 'wb') as bundle_file:
+                bundle_file.write(data)
+            os.replace(temp_path, output)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(temp_path)
+            raise
+        return output
+
+    @classmethod
+    def load_bundle(cls, path, check=False):
+        # Registers the configs of a bundle: import_config then builds them from it, with the same name, path and
+        # type_ arguments, without reading any other file. With check, changed sources make the bundle fail to load.
+        with open(path, 'rb') as bundle_file:
+            data = bundle_file.read()
+        header = binary.read_header(data, binary.BUNDLE)
+        if header is None:
+            raise ConfigManagerError(f'{path} is not a config bundle')
+        bundle = binary.loads(data, header)
+        files = bundle['files']
+        if check:
+            stale = [source for source, entry in files.items()
+                     if file_signature(source) != (entry['mtime_ns'], entry['size'])]
+            if stale:
+                raise ConfigManagerError(f'{path} is out of date: {", ".join(stale)} changed')
+        for entry in files.values():
+            # frozen executors answer from the stored results, the others are still looked up in cls.executors
+            executors = cls.executors
+            if entry['frozen']:
+                executors = ExecutorRegistry(cls.executors)
+                for executor, results in entry['frozen'].items():
+                    executors.register(executor, FrozenExecutor(executor, results))
+            entry['executors'] = executors
+        for name, c_path, type_, key in bundle['configs']:
+            cls.__bundled[(name, c_path, type_)] = (files, key)
+        return {name: cls.__from_bundle(name, c_path, type_) for name, c_path, type_, _ in bundle['configs']}
+
+    @classmethod
+    def clear_bundles(cls):
+        cls.__bundled.clear()
+
+    @classmethod
+    def publish(cls, config, name):
+        # Writes the resolved values of config to shared memory, where other processes attach to them by name.
+        # publish on the returned SharedPublisher replaces them with a new generation, close unpublishes them.
+        return SharedPublisher(name, config)
+
+    @classmethod
+    def attach(cls, name):
+        # Read-only mapping of the values published under name, decoded as they are read. It follows the
+        # generations published after it was attached.
+        return SharedConfig(name)
+
     @classmethod
     def export_config_file(cls, obj, config_name=None, path=None, type_=None, **kwargs):
-        config_dict = obj.to_dict()
-        type_ = type_ or config_dict.get('__type', cls.default_export_type)
-        cls.__set_metadata(config_dict, obj, config_name, type_)
-        config_path = cls.__get_config_path(config_name if config_name else obj.get_name() or obj.__name__, path, type_)
-        with open(config_path, 'w') as config_file:
-            cls.supported_types[type_].export_config(config_dict, config_file, **kwargs)
+        type_ = type_ or dict(obj.raw_items()).get('__type', cls.default_export_type)
+        metadata = cls.__set_metadata(dict(), obj, config_name, type_)
+        config_name = config_name if config_name else obj.get_name() or obj.__name__
+        config_path = cls.__get_config_path(config_name, path, type_)
+        write = partial(cls.__write_config_file, obj, metadata, config_path, type_, kwargs)
+        transaction = cls.__transaction()
+        if transaction is not None:
+            transaction.stage(config_path, obj, config_name, path, write)
+            return None
+        return write()
 
     @classmethod
-    def __load_config(cls, config_name, path, type_=None):
+    def capabilities(cls):
+        return {type_: type_class.capabilities() for type_, type_class in cls.supported_types.items()}
+
+    @classmethod
+    @timed('export', 'config_path')
+    def __write_config_file(cls, obj, metadata, config_path, type_, kwargs):
+        # written next to the file then renamed over it: readers see the old or the new file, never a part of it.
+        # An identical file is left untouched, so its mtime does not trigger reloads.
+        temp_path = f'{config_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp_path, 'w') as config_file:
+                cls.supported_types[type_].export_config_tree(obj, metadata, config_file, **kwargs)
+            if cls.__same_content(temp_path, config_path):
+                os.remove(temp_path)
+                return False
+            with suppress(OSError):
+                os.chmod(temp_path, stat_module.S_IMODE(os.stat(config_path).st_mode))
+            os.replace(temp_path, config_path)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(temp_path)
+            raise
+        return True
+
+    @staticmethod
+    def __same_content(path, other_path, chunk_size=65536):
+        try:
+            if os.path.getsize(path) != os.path.getsize(other_path):
+                return False
+            with open(path, 'rb') as file, open(other_path, 'rb') as other_file:
+                while True:
+                    chunk = file.read(chunk_size)
+                    if chunk != other_file.read(chunk_size):
+                        return False
+                    if not chunk:
+                        return True
+        except FileNotFoundError:
+            return False
+
+    @classmethod
+    def __transaction(cls):
+        return cls.__transactions.get()
+
+    @classmethod
+    def __staged(cls, name, path, level, type_):
+        # in a transaction, the file is locked before it is read, and a pending update is read instead of it
+        transaction = cls.__transaction()
+        if transaction is None:
+            return None
+        staged = transaction.acquire(cls.__locate_file(name, path, level, type_))
+        return staged[:3] if staged else None
+
+    @classmethod
+    def __bundle_file(cls, name, path, type_, files, freeze):
+        level, path = cls.__level_parse(name, path)
+        config_dict, name_base, c_path = cls.__config_read(name[level:], path, level, type_)
+        config_path = os.path.abspath(cls.__locate_file(name[level:], path, level, type_))
+        if config_path not in files:
+            parent = None
+            if config_dict.get('__parent'):
+                parent = cls.__bundle_file(config_dict['__parent'], config_dict.get('__parent_path', c_path),
+                                           config_dict.get('__parent_type'), files, freeze)
+            frozen = dict()
+            if freeze:
+                cls.__freeze_executors(config_dict, cls.executors.bind(c_path), freeze, frozen)
+            mtime_ns, size = file_signature(config_path)
+            files[config_path] = {'dict': config_dict, 'name': name_base, 'path': str(c_path), 'type': type_,
+                                  'parent': parent, 'mtime_ns': mtime_ns, 'size': size, 'frozen': frozen}
+        return config_path
+
+    @classmethod
+    def __freeze_executors(cls, value, executors, freeze, frozen):
+        # frozen: executor name -> argument -> result, for the references of value to the executors in freeze.
+        # Results are kept apart from the templates, which are left as they are: they are never interpolated
+        if isinstance(value, dict):
+            for item in value.values():
+                cls.__freeze_executors(item, executors, freeze, frozen)
+        elif isinstance(value, list):
+            for item in value:
+                cls.__freeze_executors(item, executors, freeze, frozen)
+        elif isinstance(value, str) and '${' in value:
+            for reference in Template(value).references:
+                if reference.executor in freeze:
+                    results = frozen.setdefault(reference.executor, dict())
+                    if reference.argument not in results:
+                        results[reference.argument] = executors[reference.executor][reference.argument]
+
+    @classmethod
+    def __from_bundle(cls, name, path, type_):
+        entry = cls.__bundled.get((name, str(path) if path else None, type_)) if cls.__bundled else None
+        return cls.__bundled_config(*entry) if entry else None
+
+    @classmethod
+    def __bundled_config(cls, files, key):
+        entry = files[key]
+        parent = cls.__bundled_config(files, entry['parent']) if entry['parent'] else None
+        if parent is not None and cls.share:
+            parent = parent.share(cls.__pool, root=True)
+        config = Config(entry['dict'], parent, entry['name'], entry['path'], entry['type'], lazy=cls.lazy,
+                        executors=entry['executors'])
+        return config.share(cls.__pool) if cls.share else config
+
+    @classmethod
+    def __load_config(cls, config_dict, config_name, path, type_=None):
         # todo implement type_ as a list that features all parents types
-        config_dict = cls.__read_config_file(config_name, path, type_)
         parent_config = cls.__load_parent_config(config_dict, path)
-        return Config(config_dict, parent_config, config_name, path, type_)
+        config = Config(config_dict, parent_config, config_name, path, type_, lazy=cls.lazy, executors=cls.executors)
+        return config.share(cls.__pool) if cls.share else config
 
     @classmethod
     def __read_config_file(cls, config_name, path, type_=None):
-        config_path, type_ = cls.__get_config_path_and_type(config_name, path, type_)
-        with open(config_path, 'r') as config_file:
-            config_dict = cls.supported_types[type_].import_config(config_file)
+        if type_ is None:
+            return cls.__detect_type(config_name, path)[2]
+        type_ = type_.lower()
+        ext = next((ext for ext in cls.__list_candidates(config_name, path) if ext.lower() == type_), type_)
+        return cls.__parse_config_file(cls.__get_config_path(config_name, path, ext), type_)
+
+    @classmethod
+    def __parse_config_file(cls, config_path, type_, text=None, stat=None):
+        # Config copies every container it is built from, so cached dicts are never handed out for mutation
+        cached = cls.__get_cached(config_path, type_)
+        if cached is not None:
+            return cached
+        compiled_cache = cls.compiled_cache and cls.supported_types[type_].compiled
+        if compiled_cache:
+            compiled, stat, text = cls.__load_compiled(config_path, type_, stat, text)
+            if compiled is not None:
+                cls.__set_cached(config_path, type_, stat, compiled)
+                return compiled
+        if text is None:
+            stat, text = cls.__read_text(config_path)
+        with instrumentation.span('parse', config_path=config_path, type_=type_):
+            config_dict = cls.supported_types[type_].loads(text)
+        if isinstance(config_dict, dict):
+            cls.__set_cached(config_path, type_, stat, config_dict)
+            if compiled_cache:
+                cls.__write_compiled(config_path, type_, stat, text, config_dict)
         return config_dict
 
+    @classmethod
+    def __compiled_path(cls, config_path, type_, cache_dir=None):
+        cache_dir = cache_dir or cls.compiled_cache_dir
+        file_name = f'{os.path.basename(config_path)}.{type_}.cdmb'
+        if cache_dir is None:
+            return os.path.join(os.path.dirname(config_path), cls.__compiled_directory, file_name)
+        # a single directory for every source: the source's absolute path keeps names apart
+        prefix = hashlib.blake2b(os.path.abspath(config_path).encode(), digest_size=8).hexdigest()
+        return os.path.join(cache_dir, f'{prefix}-{file_name}')
+
+    @classmethod
+    @timed('parse', 'config_path', 'type_')
+    def __load_compiled(cls, config_path, type_, stat=None, text=None):
+        try:
+            with open(cls.__compiled_path(config_path, type_), 'rb') as compiled_file:
+                data = compiled_file.read()
+            stat = stat or os.stat(config_path)
+        except OSError:
+            return None, stat, text
+        header = binary.read_header(data)
+        if header is None or header.type != type_ or header.size != stat.st_size:
+            return None, stat, text
+        if header.mtime_ns != stat.st_mtime_ns:
+            # touched or rewritten with the same size: like pyc's checked hashes, the content decides
+            if text is None:
+                stat, text = cls.__read_text(config_path)
+            if binary.digest(text) != header.digest:
+                return None, stat, text
+        try:
+            config_dict = binary.loads(data, header)
+        except ValueError:
+            return None, stat, text
+        if header.mtime_ns != stat.st_mtime_ns:
+            cls.__write_compiled(config_path, type_, stat, text, config_dict)
+        return config_dict, stat, text
+
+    @classmethod
+    def __write_compiled(cls, config_path, type_, stat, text, config_dict, cache_dir=None):
+        compiled_path = cls.__compiled_path(config_path, type_, cache_dir)
+        try:
+            data = binary.dumps(config_dict, binary.Header(type_, stat.st_mtime_ns, stat.st_size, binary.digest(text)))
+        except TypeError:
+            # a value without binary form (a custom YAML tag...): this file is always parsed
+            return False
+        temp_path = f'{compiled_path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(compiled_path), exist_ok=True)
+            with open(temp_path, 'wb') as compiled_file:
+                compiled_file.write(data)
+            os.replace(temp_path, compiled_path)
+        except OSError:
+            # a read-only location only costs the speedup
+            with suppress(OSError):
+                os.remove(temp_path)
+            return False
+        return True
+
+    @classmethod
+    def __try_parse_config_file(cls, config_path, type_, text=None, stat=None):
+        try:
+            config_dict = cls.__parse_config_file(config_path, type_, text, stat)
+        except Exception:
+            return None
+        return config_dict if isinstance(config_dict, dict) else None
+
+    @classmethod
+    def __set_cached(cls, config_path, type_, stat, config_dict):
+        entry = (stat.st_mtime_ns, stat.st_size, config_dict)
+        pinned = cls.__pinned.get(os.path.abspath(config_path))
+        if pinned is not None:
+            # files of watched configs stay cached whatever cache_size is, see ConfigManager.watch
+            pinned[1][type_] = entry
+        elif cls.cache_size:
+            cls.__cache.maxsize = cls.cache_size
+            cls.__cache.set((os.path.abspath(config_path), type_), entry)
+
+    @classmethod
+    def __get_cached(cls, config_path, type_):
+        pinned = cls.__pinned.get(os.path.abspath(config_path))
+        if pinned is not None:
+            entry = pinned[1].get(type_)
+        elif cls.cache_size:
+            entry = cls.__cache.get((os.path.abspath(config_path), type_))
+        else:
+            return None
+        if entry is not None:
+            try:
+                stat = os.stat(config_path)
+            except OSError:
+                return None
+            if entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                return entry[2]
+        return None
+
+    @classmethod
+    @timed('read', 'config_path')
+    def __sniff(cls, config_path, types):
+        # types ordered by TypeBase.sniff of the first characters of config_path, without those which cannot parse
+        # it, with its stat and text: None when no type remains, the rest of the file is not read then
+        with open(config_path, 'r') as config_file:
+            stat = os.fstat(config_file.fileno())
+            # small files are read whole at once, which is as cheap as reading their first characters
+            whole = stat.st_size <= cls.__sniff_size
+            head = config_file.read() if whole else config_file.read(cls.__sniff_size)
+            stripped = head.lstrip()
+            likely, unknown = [], []
+            for type_ in types:
+                guess = cls.supported_types[type_].sniff(stripped) if stripped else None
+                if guess is not False:
+                    (likely if guess else unknown).append(type_)
+            if not likely and not unknown:
+                return [], stat, None
+            return likely + unknown, stat, head if whole else head + config_file.read()
+
+    @staticmethod
+    @timed('read', 'config_path')
+    def __read_text(config_path):
+        with open(config_path, 'r') as config_file:
+            return os.fstat(config_file.fileno()), config_file.read()
+
     @classmethod
     def __load_parent_config(cls, config_dict, path, type_=None):
         parent_name = config_dict.get('__parent', None)
         parent_path = config_dict.get('__parent_path', path)
         parent_type = config_dict.get('__parent_type', type_)
-        return cls.import_config(parent_name, parent_path, parent_type) if parent_name else None
+        if parent_name and cls.lazy_parent:
+            return cls.__lazy_parent_loader(parent_name, parent_path, parent_type)
+        return cls.__import_parent(parent_name, parent_path, parent_type) if parent_name else None
+
+    @classmethod
+    def __lazy_parent_loader(cls, parent_name, parent_path, parent_type):
+        loader = partial(cls.__import_parent, parent_name, parent_path, parent_type)
+        # the name the parent will have, without loading it ( see Config.to_dict )
+        loader.name = parent_name.rpartition('.')[2]
+        return loader
+
+    @classmethod
+    @timed('parent', 'name', 'path')
+    def __import_parent(cls, name, path=None, type_=None):
+        parent = cls.__import(name, path, type_)
+        # a parent is never handed out for modification: identical ones are shared
+        return parent.share(cls.__pool, root=True) if cls.share else parent
+
+    @classmethod
+    def __import(cls, name, path=None, type_=None):
+        level, path = cls.__level_parse(name, path)
+        return cls.__config_import(name[level:], path, level, type_)[0]
 
     @classmethod
     def __config_import(cls, name, path, level=0, type_=None):
-        for c_path in chain([path], sys.path):
+        config_dict, name_base, c_path = cls.__config_read(name, path, level, type_)
+        return cls.__load_config(config_dict, name_base, c_path, type_), name_base, c_path
+
+    @classmethod
+    async def __config_import_async(cls, name, path, level=0, type_=None):
+        loop = asyncio.get_running_loop()
+        config_dict, name_base, c_path = await loop.run_in_executor(
+            None, partial(cls.__config_read, name, path, level, type_))
+        parent_config = await cls.__load_parent_config_async(config_dict, c_path)
+        config = Config(config_dict, parent_config, name_base, c_path, type_, lazy=cls.lazy, executors=cls.executors)
+        return config.share(cls.__pool) if cls.share else config, name_base, c_path
+
+    @classmethod
+    async def __load_parent_config_async(cls, config_dict, path, type_=None):
+        parent_name = config_dict.get('__parent', None)
+        parent_path = config_dict.get('__parent_path', path)
+        parent_type = config_dict.get('__parent_type', type_)
+        if not parent_name:
+            return None
+        if cls.lazy_parent:
+            return cls.__lazy_parent_loader(parent_name, parent_path, parent_type)
+        level, parent_path = cls.__level_parse(parent_name, parent_path)
+        with instrumentation.span('parent', name=parent_name, path=parent_path):
+            parent = (await cls.__config_import_async(parent_name[level:], parent_path, level, parent_type))[0]
+        return parent.share(cls.__pool, root=True) if cls.share else parent
+
+    @classmethod
+    def __config_read(cls, name, path, level=0, type_=None):
+        for name_base, c_path in cls.__search(name, path, level, type_):
             try:
-                if c_path:
-                    name_base, c_path = cls.__parse_path(name, c_path, level)
-                    return cls.__load_config(name_base, c_path, type_), name_base, c_path
+                return cls.__read_config_file(name_base, c_path, type_), name_base, c_path
             except (FileNotFoundError, PermissionError):
                 pass
 
         raise ConfigNotFoundError(name, path)
 
     @classmethod
-    def __config_export(cls, config, name, path=None, level=0, type_=None):
-        name_base, c_path = cls.__parse_path(name, path or os.getcwd(), level)
-        return cls.export_config_file(config, name_base, c_path, type_)
+    def __locate_file(cls, name, path, level=0, type_=None):
+        for name_base, c_path in cls.__search(name, path, level, type_):
+            candidates = cls.__list_candidates(name_base, c_path)
+            if type_ is not None:
+                ext = next(ext for ext in candidates if ext.lower() == type_.lower())
+            else:
+                ext = next((ext for ext in candidates if ext.lower() in cls.supported_types), candidates[0])
+            return cls.__get_config_path(name_base, c_path, ext)
+        raise ConfigNotFoundError(name, path)
+
+    @classmethod
+    def __track_watch(cls, watch, name, path, level, type_):
+        levels = cls.__watch_chain(watch.config, name, path, level, type_)
+        targets = dict()
+        for config, config_path in levels:
+            reader = FileReader(config_path.parent)
+            for key, reference, _ in template_references(config.to_dict(private=True)):
+                if reference.executor in ('read_file', 'read_file_bytes'):
+                    targets.setdefault(reader.resolve_path(reference.argument), set()).add(key)
+        files = [str(config_path) for _, config_path in levels]
+        cls.__pin(files)
+        cls.__release_watch(watch)
+        watch.chain, watch.targets = levels, targets
+        watch.signature = {path: file_signature(path) for path in chain(files, targets)}
+
+    @classmethod
+    def __release_watch(cls, watch):
+        for _, config_path in watch.chain:
+            entry = cls.__pinned.get(os.path.abspath(config_path))
+            if entry is not None:
+                entry[0] -= 1
+                if not entry[0]:
+                    del cls.__pinned[os.path.abspath(config_path)]
+        watch.chain = []
 
     @classmethod
-    def __get_config_path_and_type(cls, config_name, path, type_=None):
+    def __pin(cls, paths):
+        for path in paths:
+            cls.__pinned.setdefault(os.path.abspath(path), [0, dict()])[0] += 1
+
+    @classmethod
+    def __refresh_watch(cls, name, path, level, type_, watch):
+        config = cls.__config_import(name, path, level, type_)[0]
+        config_dict = config.to_dict(True, True)
+        changed = set(diff_keys(watch.config.to_dict(True, True), config_dict))
+        for target, keys in watch.targets.items():
+            if file_signature(target) != watch.signature.get(target):
+                changed.update(keys)
+        levels = cls.__watch_chain(config, name, path, level, type_)
+        for i, (new_level, config_path) in enumerate(levels):
+            old_level = watch.chain[i][0]
+            cls.__update_in_place(old_level, new_level)
+            # shared parents are read-only: the watched config gets the new ones instead
+            if cls.share or i + 1 == len(levels) or i + 1 == len(watch.chain) or \
+                    levels[i + 1][1] != watch.chain[i + 1][1]:
+                old_level.set_parent(new_level.get_parent())
+                break
+        cls.__track_watch(watch, name, path, level, type_)
+        if cls.prefetch:
+            watch.config.prefetch()
+        return dependent_keys(config_dict, changed)
+
+    @classmethod
+    def __watch_chain(cls, config, name, path, level=0, type_=None):
+        chain, config_path = [], cls.__locate_file(name, path, level, type_)
+        while config is not None:
+            chain.append((config, config_path))
+            parent_name = cls.__get_raw(config, '__parent')
+            if not parent_name:
+                break
+            parent_level, parent_path = cls.__level_parse(parent_name, cls.__get_raw(config, '__parent_path',
+                                                                                     config_path.parent))
+            config_path = cls.__locate_file(parent_name[parent_level:], parent_path, parent_level,
+                                            cls.__get_raw(config, '__parent_type'))
+            config = config.get_parent()
+        return chain
+
+    @classmethod
+    def __update_in_place(cls, old, new):
+        old_dict, new_dict = cls.__raw_dict(old), cls.__raw_dict(new)
+        for key in diff_keys(old_dict, new_dict):
+            value = get_path(new_dict, key)
+            if value is missing:
+                del old[key]
+            else:
+                old[key] = value
+
+    @classmethod
+    def __raw_dict(cls, config):
+        config_dict = config.to_dict(private=True)
+        if '__parent' in config_dict:
+            config_dict['__parent'] = cls.__get_raw(config, '__parent')
+        return config_dict
+
+    @staticmethod
+    def __get_raw(config, key, default=None):
+        try:
+            return config.get_raw(key, private=True)
+        except KeyError:
+            return default
+
+    @classmethod
+    def __search(cls, name, path, level=0, type_=None):
+        key = (name, str(path) if path else None, level, type_, tuple(sys.path))
+        entry = cls.__locations.get(key)
+        failed = None
+        if entry is not None and all(cls.__mtime(directory) == mtime for directory, mtime in entry[1]):
+            yield entry[0]
+            # the cached location could not be loaded: forget it and scan the search roots again
+            cls.__locations.pop(key)
+            failed = entry[0]
+
+        probes, found = [], False
+        for c_path in chain([path], sys.path):
+            if not c_path:
+                continue
+            name_base, c_path = cls.__parse_path(name, c_path, level)
+            mtime = cls.__mtime(c_path)
+            probes.append((c_path, mtime))
+            if mtime is None or not cls.__has_candidates(name_base, c_path, type_):
+                continue
+            if not found and failed is None and time.time_ns() - max(m for _, m in probes if m) > cls.__racy_window:
+                cls.__locations.set(key, ((name_base, c_path), tuple(probes)))
+            found = True
+            if (name_base, c_path) != failed:
+                yield name_base, c_path
+
+    @classmethod
+    @timed('search', 'config_name', 'path')
+    def __has_candidates(cls, config_name, path, type_=None):
+        try:
+            candidates = cls.__list_candidates(config_name, path)
+        except OSError:
+            return False
         if type_ is None:
-            type_, ext = cls.__detect_type(config_name, path)
-        else:
-            ext = type_
-        return cls.__get_config_path(config_name, path, ext), type_.lower()
+            return bool(candidates)
+        return any(ext.lower() == type_.lower() for ext in candidates)
+
+    @staticmethod
+    def __mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def __config_export(cls, config, name, path=None, level=0, type_=None):
+        name_base, c_path = cls.__parse_path(name, path or os.getcwd(), level)
+        return cls.export_config_file(config, name_base, c_path, type_)
 
     @classmethod
+    @timed('detect', 'config_name', 'path')
     def __detect_type(cls, config_name, path):
-        candidates = [os.path.splitext(f)[1][1:] for f in os.listdir(path)
-                      if os.path.isfile(os.path.join(path, f)) and f.startswith(config_name)]
+        candidates = cls.__list_candidates(config_name, path)
+        if not candidates:
+            raise FileNotFoundError
         # first detection based on the extension:
         for ext in candidates:
-            ext = ext.lower()
-            if ext in cls.supported_types:
-                full_path = cls.__get_config_path(config_name, path, ext)
-                if cls.supported_types[ext].is_readable(full_path):
-                    return ext, ext
-        # second detection based on the content:
+            type_ = ext.lower()
+            if type_ in cls.supported_types:
+                config_path = cls.__get_config_path(config_name, path, ext)
+                config_dict = cls.__try_parse_config_file(config_path, type_)
+                if config_dict is not None:
+                    return type_, config_path, config_dict
+        # second detection based on the content, trying each type once: the first characters of a candidate tell
+        # which types may parse it, most likely first, and it is only read whole, once, when some type may
+        types = dict()
+        for type_, type_class in cls.supported_types.items():
+            types.setdefault(type_class, type_)
         for ext in candidates:
-            ext = ext.lower() if ext else ext
-            for type_ in cls.supported_types:
-                full_path = cls.__get_config_path(config_name, path, ext)
-                if cls.supported_types[type_].is_readable(full_path):
-                    return type_, ext
-        if candidates:
-            raise ConfigManagerError(f'Could not auto-detect type of Config: {config_name}')
-        else:
-            raise FileNotFoundError
+            config_path = cls.__get_config_path(config_name, path, ext)
+            excluded = cls.supported_types.get(ext.lower())
+            candidate_types = [type_ for type_ in types.values() if cls.supported_types[type_] is not excluded]
+            stat, text = None, None
+            if all(cls.__get_cached(config_path, type_) is None for type_ in candidate_types):
+                try:
+                    candidate_types, stat, text = cls.__sniff(config_path, candidate_types)
+                except (OSError, UnicodeDecodeError):
+                    continue
+            for type_ in candidate_types:
+                config_dict = cls.__try_parse_config_file(config_path, type_, text, stat)
+                if config_dict is not None:
+                    return type_, config_path, config_dict
+        raise ConfigManagerError(f'Could not auto-detect type of Config: {config_name}')
+
+    @classmethod
+    def __list_candidates(cls, config_name, path):
+        return cls.__directory_index(path).get(config_name, ())
+
+    @classmethod
+    def __directory_index(cls, path):
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime_ns
+        entry = cls.__directories.get(path)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+        index = dict()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                # a leading dot is a level, never part of a config name: dotfiles ( transaction locks... ) are skipped
+                if entry.name[:1] != '.' and entry.is_file():
+                    stem, ext = os.path.splitext(entry.name)
+                    index.setdefault(stem, []).append(ext[1:])
+        # Like git's racy-clean check: a directory modified within the timestamp granularity may still change
+        # without its mtime moving, so its listing is only reused once it is old enough.
+        if time.time_ns() - mtime > cls.__racy_window:
+            cls.__directories.set(path, (mtime, index))
+        return index
 
     @classmethod
     def __parse_path(cls, name, path, level):
@@ -144,7 +913,7 @@ class ConfigManager:
 
     @staticmethod
     def __get_config_path(config_name, path, type_=None):
-        return Path(path) / (config_name + f'.{type_}' if type_ else '')
+        return Path(path) / (config_name + (f'.{type_}' if type_ else ''))
 
     @staticmethod
     def __level_parse(name, path=None):
@@ -162,7 +931,7 @@ class ConfigManager:
     def __set_metadata(config_dict, obj, config_name, type_):
         config_dict['__name'] = config_name
         parent = obj.get_parent()
-        parent_type = parent.get('__type', None) if parent else None
+        parent_type = parent.get('__type', None) if parent is not None else None
         if parent_type:
             config_dict['__parent_type'] = parent_type
         config_dict['__type'] = type_
@@ -1,39 +1,120 @@
+import asyncio
+import inspect
+import io
+import mmap
 import os
+import time
 
+from functools import partial
+from stat import S_ISREG
+
+from configDmanager._cache import LRUCache
 from configDmanager.errors import FormatExecutorError
 
 
 class FormatExecutor:
+    @property
+    def asynchronous(self):
+        # its values can only be fetched by Config.prefetch_async
+        return inspect.iscoroutinefunction(self._execute)
+
     def __getitem__(self, item):
+        if self.asynchronous:
+            raise FormatExecutorError(f'{type(self).__name__} is asynchronous: its values must be prefetched '
+                                      f'(see ConfigManager.import_config_async)', RuntimeError)
         return self._execute(item)
 
+    async def execute_async(self, item):
+        if self.asynchronous:
+            return await self._execute(item)
+        return await asyncio.get_running_loop().run_in_executor(None, self._execute, item)
+
+    def execute_many(self, items):
+        # Batched lookup used by Config.prefetch: override it to query a slow backend once for all items.
+        # Items that fail are left out, their error is raised again when they are accessed.
+        results = dict()
+        for item in items:
+            try:
+                results[item] = self[item]
+            except Exception:
+                pass
+        return results
+
+    async def execute_many_async(self, items):
+        items = list(items)
+        results = await asyncio.gather(*(self.execute_async(item) for item in items), return_exceptions=True)
+        return {item: result for item, result in zip(items, results) if not isinstance(result, BaseException)}
+
     def _execute(self, item):
         pass
 
 
 class FileReader(FormatExecutor):
-    def __init__(self, default_path):
+    # Contents are shared by every FileReader, validated by (mtime_ns, size) and bounded by their total size
+    cache_bytes = 4 * 1024 * 1024
+    mmap_threshold = 1024 * 1024
+    __cache = LRUCache(weigh=lambda entry: entry[1])
+
+    def __init__(self, default_path, binary=False):
         self.default_path = default_path
+        self.binary = binary
 
     def _execute(self, file_path):
-        if os.path.isabs(file_path):
-            return self.read_file(file_path)
-        else:
-            if self.default_path:
-                path = os.path.join(self.default_path, file_path)
-                if os.path.isfile(path):
-                    return self.read_file(path)
-            return self.read_file(file_path)
-
-    @staticmethod
-    def read_file(file_path):
+        path, stat = self.__stat(file_path)
+        return self.read_file(path, self.binary, stat)
+
+    def resolve_path(self, file_path):
+        return self.__stat(file_path)[0]
+
+    @classmethod
+    def read_file(cls, file_path, binary=False, stat=None):
         try:
-            with open(file_path, 'r') as file:
-                content = file.read()
+            stat = stat or os.stat(file_path)
+            key = (os.path.abspath(file_path), binary)
+            if cls.cache_bytes:
+                entry = cls.__cache.get(key)
+                if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                    return entry[2]
+            content = cls.__read(file_path, binary, stat.st_size)
         except FileNotFoundError as e:
             raise FormatExecutorError(e, FileNotFoundError)
+        if cls.cache_bytes:
+            cls.__cache.maxsize = cls.cache_bytes
+            cls.__cache.set(key, (stat.st_mtime_ns, stat.st_size, content))
         return content
 
+    @classmethod
+    def cache_info(cls):
+        return cls.__cache.info()
+
+    @classmethod
+    def clear_cache(cls):
+        cls.__cache.clear()
+
+    def __stat(self, file_path):
+        if not os.path.isabs(file_path) and self.default_path:
+            path = os.path.join(self.default_path, file_path)
+            try:
+                stat = os.stat(path)
+                if S_ISREG(stat.st_mode):
+                    return path, stat
+            except OSError:
+                pass
+        try:
+            return file_path, os.stat(file_path)
+        except OSError:
+            return file_path, None
+
+    @classmethod
+    def __read(cls, file_path, binary, size):
+        if size < cls.mmap_threshold:
+            with open(file_path, 'rb' if binary else 'r') as file:
+                return file.read()
+        with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            data = view[:]
+        # decoded exactly like open(file_path, 'r') would
+        return data if binary else io.TextIOWrapper(io.BytesIO(data)).read()
+
 
 class EnvironReader(FormatExecutor):
     def _execute(self, item):
@@ -41,3 +122,101 @@ class EnvironReader(FormatExecutor):
             return os.environ[item]
         except KeyError as e:
             raise FormatExecutorError(f'Could not find {e} in Environment variables', KeyError)
+
+
+class FrozenExecutor(FormatExecutor):
+    # Results of an executor stored by ConfigManager.bundle, served as they were when it ran
+    def __init__(self, name, results):
+        self.name = name
+        self.results = results
+
+    def _execute(self, item):
+        try:
+            return self.results[item]
+        except KeyError as e:
+            raise FormatExecutorError(f'Could not find {e} in the frozen results of {self.name}', KeyError)
+
+
+class CachedExecutor:
+    def __init__(self, executor, ttl=None):
+        self.executor = executor
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__results = dict()
+
+    def __getitem__(self, item):
+        if self.ttl:
+            entry = self.__results.get(item)
+            if entry is not None and entry[1] > time.monotonic():
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        value = self.executor[item]
+        self.__store({item: value})
+        return value
+
+    @property
+    def asynchronous(self):
+        return self.executor.asynchronous
+
+    def execute_many(self, items):
+        return self.__store(self.executor.execute_many(items))
+
+    async def execute_many_async(self, items):
+        return self.__store(await self.executor.execute_many_async(items))
+
+    def clear(self):
+        self.__results = dict()
+
+    def __store(self, results):
+        if self.ttl:
+            expires = time.monotonic() + self.ttl
+            for item, value in results.items():
+                self.__results[item] = (value, expires)
+        return results
+
+
+class ExecutorRegistry:
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.version = 0
+        self.__executors = dict()
+        self.__bound = LRUCache(maxsize=256)
+
+    def register(self, name, executor, ttl=None):
+        # executor: a FormatExecutor shared by every config, or a callable building one from the config's path.
+        # With a ttl, results are cached for ttl seconds.
+        if isinstance(executor, FormatExecutor):
+            self.__executors[name] = CachedExecutor(executor, ttl)
+        elif callable(executor):
+            self.__executors[name] = (executor, ttl)
+        else:
+            raise TypeError('executor should be a FormatExecutor or a callable returning one')
+        self.version += 1
+
+    def unregister(self, name):
+        del self.__executors[name]
+        self.version += 1
+
+    def bind(self, path=None):
+        key = (path, self.__versions())
+        bound = self.__bound.get(key)
+        if bound is None:
+            bound = dict(self.parent.bind(path)) if self.parent else dict()
+            for name, entry in self.__executors.items():
+                bound[name] = entry if isinstance(entry, CachedExecutor) else CachedExecutor(entry[0](path), entry[1])
+            self.__bound.set(key, bound)
+        return bound
+
+    def __versions(self):
+        return (self.version, self.parent.__versions()) if self.parent else (self.version,)
+
+    def __contains__(self, name):
+        return name in self.__executors or (self.parent is not None and name in self.parent)
+
+
+format_executors = ExecutorRegistry()
+format_executors.register('read_file', FileReader)
+format_executors.register('read_file_bytes', partial(FileReader, binary=True))
+format_executors.register('os_environ', EnvironReader())
@@ -0,0 +1,114 @@
+import functools
+import inspect
+import threading
+import time
+import warnings
+
+
+class Span:
+    __slots__ = ('instrumentation', 'phase', 'details', 'start')
+
+    def __init__(self, instrumentation, phase, details):
+        self.instrumentation = instrumentation
+        self.phase = phase
+        self.details = details
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        self.instrumentation.record(self.phase, self.start, time.perf_counter_ns() - self.start, self.details,
+                                    error)
+
+
+class NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        pass
+
+
+class Instrumentation:
+    # Counts and times the phases of loading, resolving and exporting configs when enabled, see ConfigManager.stats.
+    # Hooks are called with (phase, start_ns, duration_ns, details, error) at the end of every span.
+    def __init__(self):
+        self.enabled = False
+        self.__stats = dict()
+        self.__hooks = []
+        self.__lock = threading.Lock()
+        self.__no_span = NoSpan()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def add_hook(self, hook):
+        self.__hooks = self.__hooks + [hook]
+
+    def remove_hook(self, hook):
+        self.__hooks = [other for other in self.__hooks if other is not hook]
+
+    def span(self, phase, **details):
+        return Span(self, phase, details) if self.enabled else self.__no_span
+
+    def record(self, phase, start, duration, details, error=None):
+        with self.__lock:
+            stats = self.__stats.get(phase)
+            if stats is None:
+                stats = self.__stats[phase] = [0, 0, 0, 0]
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+            stats[3] += error is not None
+        for hook in self.__hooks:
+            try:
+                hook(phase, start, duration, details, error)
+            except Exception as e:
+                # a failing tracer must not break configuration loading
+                warnings.warn(f'Instrumentation hook {hook!r} failed: {e}', RuntimeWarning)
+
+    def stats(self):
+        with self.__lock:
+            return {phase: {'count': count, 'seconds': total / 1e9, 'max_seconds': longest / 1e9, 'errors': errors}
+                    for phase, (count, total, longest, errors) in self.__stats.items()}
+
+    def reset(self):
+        with self.__lock:
+            self.__stats.clear()
+
+
+instrumentation = Instrumentation()
+
+
+def timed(phase, *names):
+    # Times every call of the decorated function as a span of phase, with the named arguments as details.
+    # Disabled, it costs one attribute lookup per call.
+    def decorate(function):
+        signature = inspect.signature(function)
+
+        def span(args, kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+            return Span(instrumentation, phase, {name: arguments.get(name) for name in names})
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                if not instrumentation.enabled:
+                    return await function(*args, **kwargs)
+                with span(args, kwargs):
+                    return await function(*args, **kwargs)
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not instrumentation.enabled:
+                    return function(*args, **kwargs)
+                with span(args, kwargs):
+                    return function(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,38 @@
+import threading
+
+
+class Frame:
+    __slots__ = ('config', 'key', 'label', 'reads', 'volatile')
+
+    def __init__(self, config, key, label):
+        self.config = config
+        self.key = key
+        self.label = label
+        self.reads = []
+        self.volatile = False
+
+
+class ResolutionStack(threading.local):
+    def __init__(self):
+        self.frames = []
+        self.active = set()
+        self.reference = None
+
+    def push(self, frame):
+        node = (id(frame.config), frame.key)
+        if node in self.active:
+            return False
+        self.active.add(node)
+        self.frames.append(frame)
+        return True
+
+    def pop(self):
+        frame = self.frames.pop()
+        self.active.remove((id(frame.config), frame.key))
+        return frame
+
+    def cycle_path(self, label):
+        return ' -> '.join([frame.label for frame in self.frames] + [label])
+
+
+stack = ResolutionStack()
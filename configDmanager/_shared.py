@@ -0,0 +1,335 @@
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from collections.abc import Mapping
+
+from configDmanager import _binary as binary
+from configDmanager._config import Config
+from configDmanager._snapshot import ConfigSnapshot
+from configDmanager.errors import ConfigManagerError, ConfigNotFoundError
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+# Attaching maps segments without registering them with the resource tracker, which would unlink them when the
+# attached process exits ( bpo-39959 ): SharedMemory(track=False) does that since Python 3.13, before it Segment
+# opens them with the module SharedMemory uses on POSIX
+_posixshmem = None
+if sys.version_info < (3, 13):
+    try:
+        import _posixshmem
+    except ImportError:
+        pass
+
+# A published config lives in two shared memory segments:
+#
+#   name               control block: magic | generation i64 | generation i64, written one after the other
+#   name.<generation>  the resolved values, in the compiled cache's binary form ( kind SHARED, see _binary )
+#
+# Publishing writes a new generation segment, then its number in the control block, then unlinks the previous
+# one: processes still reading it keep their mapping until they switch.
+
+CONTROL_MAGIC = b'CDMS'
+_control = struct.Struct('<4s4xqq')
+# reads of a control block, or of a generation, retried while a publisher is writing it before giving up
+_retries = 1000
+
+missing = object()
+
+
+def _create(name, size):
+    if shared_memory is None:
+        raise ConfigManagerError('Shared memory is not supported on this platform')
+    try:
+        return shared_memory.SharedMemory(name, create=True, size=max(size, 1))
+    except FileExistsError:
+        raise ConfigManagerError(f'{name} is already published') from None
+
+
+class Segment:
+    # Read-only mapping of a segment, not registered with the resource tracker: SharedMemory(track=False) before
+    # Python 3.13, on POSIX
+    def __init__(self, name):
+        descriptor = _posixshmem.shm_open(f'/{name}', os.O_RDONLY, mode=0o600)
+        try:
+            self.__mmap = mmap.mmap(descriptor, os.fstat(descriptor).st_size, prot=mmap.PROT_READ)
+        finally:
+            os.close(descriptor)
+        self.name = name
+        self.buf = memoryview(self.__mmap)
+
+    def close(self):
+        self.buf.release()
+        self.__mmap.close()
+
+
+def _open(name):
+    if shared_memory is None:
+        raise ConfigManagerError('Shared memory is not supported on this platform')
+    elif sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    elif _posixshmem is not None:
+        return Segment(name)
+    # Windows frees a segment with its last handle: nothing to untrack
+    return shared_memory.SharedMemory(name)
+
+
+def _read_generation(control):
+    # a generation is only trusted when both copies agree: the block may be read while it is being written
+    for _ in range(_retries):
+        magic, generation, check = _control.unpack_from(control.buf)
+        if magic != CONTROL_MAGIC:
+            raise ConfigManagerError(f'{control.name} is not a published config')
+        if generation == check:
+            return generation
+        time.sleep(0)
+    raise ConfigManagerError(f'Could not read the generation of {control.name}: it is being published')
+
+
+def _resolved(config):
+    if isinstance(config, Config):
+        config = config.freeze()
+    if isinstance(config, ConfigSnapshot):
+        return config.to_dict()
+    return dict(config)
+
+
+class SharedPublisher:
+    # Owns the segments of a config published by ConfigManager.publish
+    def __init__(self, name, config):
+        self.name = name
+        self.generation = 0
+        self.__segment = None
+        self.__control = None
+        self.__lock = threading.Lock()
+        self.publish(config)
+
+    def publish(self, config):
+        with self.__lock:
+            if self.__control is None and self.generation:
+                raise ConfigManagerError(f'{self.name} is closed')
+            generation = self.generation + 1
+            header = binary.Header('shared', generation, 0, bytes(binary.DIGEST_SIZE), kind=binary.SHARED)
+            data = binary.dumps(_resolved(config), header, structured=True)
+            segment = _create(f'{self.name}.{generation}', len(data))
+            segment.buf[:len(data)] = data
+            if self.__control is None:
+                try:
+                    self.__control = _create(self.name, _control.size)
+                except BaseException:
+                    self.__unlink(segment)
+                    raise
+                _control.pack_into(self.__control.buf, 0, CONTROL_MAGIC, generation, generation)
+            else:
+                struct.pack_into('<q', self.__control.buf, 8, generation)
+                struct.pack_into('<q', self.__control.buf, 16, generation)
+            previous, self.__segment, self.generation = self.__segment, segment, generation
+            if previous is not None:
+                self.__unlink(previous)
+            return generation
+
+    def close(self):
+        with self.__lock:
+            for segment in (self.__segment, self.__control):
+                if segment is not None:
+                    self.__unlink(segment)
+            self.__segment = self.__control = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    @staticmethod
+    def __unlink(segment):
+        segment.close()
+        segment.unlink()
+
+
+class SharedView(Mapping):
+    # Read-only view of a dict of a published generation: its keys are indexed on first access, and its values
+    # are decoded when they are read.
+    __slots__ = ('__segment', '__offset', '__offsets', '__values')
+
+    def __init__(self, segment, offset):
+        object.__setattr__(self, '_SharedView__segment', segment)
+        object.__setattr__(self, '_SharedView__offset', offset)
+        object.__setattr__(self, '_SharedView__offsets', None)
+        object.__setattr__(self, '_SharedView__values', dict())
+
+    def get_name(self):
+        name = self.__get('__name')
+        return None if name is missing else name
+
+    def to_dict(self, private=True):
+        return {key: self.__thaw(self.__value(key), private) for key in self.__get_offsets()
+                if private or key[:2] != '__'}
+
+    def __getitem__(self, k):
+        if isinstance(k, dict):
+            return {name: self[key] for key, name in k.items()}
+        elif not (isinstance(k, str)) and hasattr(k, '__iter__'):
+            return {key: self[key] for key in k}
+        value = self.__get(k)
+        if value is missing:
+            raise KeyError(f"Could not find param '{k}' in {self.get_name() or 'shared config'}")
+        return value
+
+    def __getattr__(self, item):
+        if item[:2] != '__' and item in self.__get_offsets():
+            return self.__value(item)
+        raise AttributeError(f"'SharedView' object has no attribute '{item}'")
+
+    def __setattr__(self, key, value):
+        raise TypeError('SharedView is read-only')
+
+    def __delattr__(self, item):
+        raise TypeError('SharedView is read-only')
+
+    def __contains__(self, k):
+        return self.__get(k) is not missing
+
+    def __iter__(self):
+        return (key for key in self.__get_offsets() if key[:2] != '__')
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"SharedView: {self.to_dict(private=True)}"
+
+    def __str__(self):
+        return str(self.to_dict(private=False))
+
+    def __get(self, key):
+        if not isinstance(key, str):
+            return missing
+        view = self
+        for name in (key,) if key in self.__get_offsets() else key.split('.'):
+            if type(view) is not SharedView or name not in view.__get_offsets():
+                return missing
+            view = view.__value(name)
+        return view
+
+    def __get_offsets(self):
+        offsets = self.__offsets
+        if offsets is None:
+            offsets = binary.dict_offsets(self.__segment.buf, self.__offset)
+            object.__setattr__(self, '_SharedView__offsets', offsets)
+        return offsets
+
+    def __value(self, key):
+        try:
+            return self.__values[key]
+        except KeyError:
+            value = self.__values[key] = self.__decode(self.__segment, self.__get_offsets()[key])
+            return value
+
+    @classmethod
+    def __decode(cls, segment, offset):
+        data = segment.buf
+        tag = data[offset]
+        if tag == binary.DICT:
+            return SharedView(segment, offset)
+        elif tag == binary.LIST:
+            return tuple(cls.__decode(segment, item) for item in binary.list_offsets(data, offset))
+        return binary.decode(data, offset)
+
+    @classmethod
+    def __thaw(cls, value, private):
+        if type(value) is SharedView:
+            return value.to_dict(private)
+        elif type(value) is tuple:
+            return [cls.__thaw(item, private) for item in value]
+        return value
+
+
+class SharedConfig(Mapping):
+    # Config attached by ConfigManager.attach. Every access checks the published generation first and switches
+    # to a newer one: values read through one access, or through a nested view, always come from one generation.
+    def __init__(self, name):
+        self.name = name
+        try:
+            self.__control = _open(name)
+        except FileNotFoundError:
+            raise ConfigNotFoundError(name, 'shared memory') from None
+        self.__current = (0, None)
+        self.__switch()
+
+    @property
+    def generation(self):
+        return self.__view()[0]
+
+    def get_name(self):
+        return self.__view()[1].get_name()
+
+    def to_dict(self, private=True):
+        return self.__view()[1].to_dict(private)
+
+    def close(self):
+        self.__current = (self.__current[0], None)
+        self.__control.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __getitem__(self, k):
+        return self.__view()[1][k]
+
+    def __getattr__(self, item):
+        if item[:2] == '__':
+            raise AttributeError(f"'SharedConfig' object has no attribute '{item}'")
+        return getattr(self.__view()[1], item)
+
+    def __contains__(self, k):
+        return k in self.__view()[1]
+
+    def __iter__(self):
+        return iter(self.__view()[1])
+
+    def __len__(self):
+        return len(self.__view()[1])
+
+    def __repr__(self):
+        return f"SharedConfig: {self.to_dict(private=True)}"
+
+    def __str__(self):
+        return str(self.to_dict(private=False))
+
+    def __view(self):
+        current = self.__current
+        if current[1] is None:
+            raise ConfigManagerError(f'{self.name} is closed')
+        if _read_generation(self.__control) != current[0]:
+            current = self.__switch()
+        return current
+
+    def __switch(self):
+        for _ in range(_retries):
+            generation = _read_generation(self.__control)
+            if not generation:
+                raise ConfigNotFoundError(self.name, 'shared memory')
+            try:
+                segment = _open(f'{self.name}.{generation}')
+            except FileNotFoundError:
+                if _read_generation(self.__control) == generation:
+                    raise ConfigNotFoundError(self.name, 'shared memory') from None
+                # replaced by an even newer generation since the control block was read
+                time.sleep(0)
+                continue
+            header = binary.read_header(segment.buf, binary.SHARED)
+            if header is None or header.mtime_ns != generation:
+                segment.close()
+                raise ConfigManagerError(f'{segment.name} is not a published config')
+            self.__current = (generation, SharedView(segment, header.offset))
+            return self.__current
+        raise ConfigManagerError(f'Could not attach {self.name}: it is being published')
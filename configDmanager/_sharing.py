@@ -0,0 +1,36 @@
+import sys
+import threading
+import weakref
+
+
+class SharingPool:
+    # Canonical Config nodes by structural key, see Config.share
+    def __init__(self):
+        self.hits = 0
+        self.bytes_saved = 0
+        self.__nodes = weakref.WeakValueDictionary()
+        self.__lock = threading.Lock()
+
+    def adopt(self, key, node, footprint):
+        with self.__lock:
+            shared = self.__nodes.get(key)
+            if shared is None:
+                self.__nodes[key] = shared = node
+            elif shared is not node:
+                self.hits += 1
+                self.bytes_saved += footprint()
+        return shared
+
+    def string(self, value):
+        shared = sys.intern(value)
+        if shared is not value:
+            self.bytes_saved += sys.getsizeof(value)
+        return shared
+
+    def clear(self):
+        with self.__lock:
+            self.__nodes.clear()
+            self.hits = self.bytes_saved = 0
+
+    def report(self):
+        return {'nodes': len(self.__nodes), 'hits': self.hits, 'bytes_saved': self.bytes_saved}
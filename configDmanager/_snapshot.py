@@ -0,0 +1,80 @@
+from collections.abc import Mapping
+
+
+class ConfigSnapshot(Mapping):
+    __slots__ = ('__values', '__index', '__keys', '__name')
+
+    def __init__(self, values: dict, index: dict = None, name: str = None):
+        object.__setattr__(self, '_ConfigSnapshot__values', values)
+        object.__setattr__(self, '_ConfigSnapshot__index', values if index is None else index)
+        object.__setattr__(self, '_ConfigSnapshot__keys', tuple(key for key in values if key[:2] != '__'))
+        object.__setattr__(self, '_ConfigSnapshot__name', name)
+
+    @classmethod
+    def from_items(cls, items, parent: 'ConfigSnapshot' = None, name: str = None):
+        values = dict(parent.__values) if parent is not None else dict()
+        index = dict(parent.__index) if parent is not None else dict()
+        for key, value in items:
+            previous = values.get(key)
+            if type(previous) is ConfigSnapshot and type(value) is not ConfigSnapshot:
+                for sub_key in previous.__index:
+                    index.pop(f'{key}.{sub_key}', None)
+            values[key] = index[key] = value
+            if type(value) is ConfigSnapshot:
+                for sub_key, sub_value in value.__index.items():
+                    index[f'{key}.{sub_key}'] = sub_value
+        return cls(values, index, name)
+
+    def get_name(self):
+        return self.__name
+
+    def to_dict(self, private=True):
+        return {key: self.__thaw(value, private) for key, value in self.__values.items()
+                if private or key[:2] != '__'}
+
+    def __getitem__(self, k):
+        if isinstance(k, dict):
+            return ConfigSnapshot({name: self[key] for key, name in k.items()})
+        elif not (isinstance(k, str)) and hasattr(k, '__iter__'):
+            return ConfigSnapshot({key: self[key] for key in k})
+        try:
+            return self.__index[k]
+        except KeyError:
+            raise KeyError(f"Could not find param '{k}' in {self.__name if self.__name else 'snapshot'}") from None
+
+    def __getattr__(self, item):
+        if item[:2] != '__':
+            try:
+                return self.__values[item]
+            except KeyError:
+                pass
+        raise AttributeError(f"'ConfigSnapshot' object has no attribute '{item}'")
+
+    def __setattr__(self, key, value):
+        raise TypeError('ConfigSnapshot is immutable')
+
+    def __delattr__(self, item):
+        raise TypeError('ConfigSnapshot is immutable')
+
+    def __contains__(self, k):
+        return k in self.__index
+
+    def __iter__(self):
+        return iter(self.__keys)
+
+    def __len__(self):
+        return len(self.__keys)
+
+    def __repr__(self):
+        return f"ConfigSnapshot: {self.to_dict(private=True)}"
+
+    def __str__(self):
+        return str(self.to_dict(private=False))
+
+    @classmethod
+    def __thaw(cls, value, private):
+        if type(value) is ConfigSnapshot:
+            return value.to_dict(private)
+        elif type(value) is tuple:
+            return [cls.__thaw(item, private) for item in value]
+        return value
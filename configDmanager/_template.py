@@ -0,0 +1,70 @@
+import re
+
+
+class Reference:
+    __slots__ = ('key', 'executor', 'argument')
+
+    def __init__(self, key, executor=None, argument=None):
+        self.key = key
+        self.executor = executor
+        self.argument = argument
+
+    def resolve(self, lookup, execute, raw=False):
+        try:
+            value = lookup(self.key)
+        except KeyError:
+            if self.executor is None:
+                raise KeyError(self.key)
+            try:
+                value = execute(self.executor, self.argument)
+            except KeyError:
+                raise KeyError(self.key) from None
+        # bytes (see read_file_bytes) are kept as is when they are the whole value
+        return value if raw and type(value) is bytes else str(value)
+
+
+class Template:
+    __slots__ = ('text', 'segments')
+
+    __c_regex = re.compile(r"\${(.*?)}")
+    __c_fe_regex = re.compile(r'(.*?)\[(.*?)\]')
+
+    def __init__(self, text):
+        self.text = text
+        self.segments = self.__compile(text) if '${' in text else ()
+
+    @property
+    def constant(self):
+        return not self.segments
+
+    @property
+    def references(self):
+        return [segment for segment in self.segments if type(segment) is Reference]
+
+    def render(self, lookup, execute):
+        if not self.segments:
+            return self.text
+        if len(self.segments) == 1:
+            return self.segments[0].resolve(lookup, execute, raw=True)
+        return ''.join([segment if type(segment) is str else segment.resolve(lookup, execute)
+                        for segment in self.segments])
+
+    @classmethod
+    def __compile(cls, text):
+        segments = []
+        position = 0
+        for match in cls.__c_regex.finditer(text):
+            if match.start() > position:
+                segments.append(text[position:match.start()])
+            key = match.group(1)
+            executor_match = cls.__c_fe_regex.fullmatch(key)
+            if executor_match:
+                segments.append(Reference(key, executor_match.group(1), executor_match.group(2)))
+            else:
+                segments.append(Reference(key))
+            position = match.end()
+        if not segments:
+            return ()
+        if position < len(text):
+            segments.append(text[position:])
+        return tuple(segments)
@@ -0,0 +1,45 @@
+import os
+
+try:
+    import fcntl
+except ImportError:
+    # no advisory locks on this platform: transactions still batch and write atomically
+    fcntl = None
+
+
+class Transaction:
+    # Exports staged by ConfigManager.transaction, written once each when it ends
+    def __init__(self, lock=False):
+        self.lock = lock and fcntl is not None
+        self.pending = dict()
+        self.__locks = dict()
+
+    def acquire(self, path):
+        # locks path and returns what is staged for it. The lock is held on .<file>.lock beside it, which outlives
+        # replacements of path: config names never start with a dot, so no import ever takes it for a config
+        path = os.path.abspath(path)
+        if self.lock and path not in self.__locks:
+            directory, file_name = os.path.split(path)
+            descriptor = os.open(os.path.join(directory, f'.{file_name}.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(descriptor, fcntl.LOCK_EX)
+            except BaseException:
+                os.close(descriptor)
+                raise
+            self.__locks[path] = descriptor
+        return self.pending.get(path)
+
+    def stage(self, path, config, name, directory, write):
+        self.acquire(path)
+        self.pending[os.path.abspath(path)] = (config, name, directory, write)
+
+    def commit(self):
+        pending, self.pending = self.pending, dict()
+        return [path for path, (_, _, _, write) in pending.items() if write()]
+
+    def release(self):
+        self.pending.clear()
+        for descriptor in self.__locks.values():
+            fcntl.flock(descriptor, fcntl.LOCK_UN)
+            os.close(descriptor)
+        self.__locks.clear()
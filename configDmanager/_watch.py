@@ -0,0 +1,196 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+import time
+import warnings
+
+from configDmanager._template import Template
+
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+missing = object()
+
+
+def diff_keys(old, new, prefix=''):
+    keys = []
+    for key in old.keys() | new.keys():
+        old_value, new_value = old.get(key, missing), new.get(key, missing)
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            keys.extend(diff_keys(old_value, new_value, f'{prefix}{key}.'))
+        elif old_value is missing or new_value is missing or old_value != new_value:
+            keys.append(f'{prefix}{key}')
+    return sorted(keys)
+
+
+def template_references(config_dict, prefix=''):
+    for key, value in config_dict.items():
+        if isinstance(value, str):
+            for reference in Template(value).references:
+                yield f'{prefix}{key}', reference, f'{prefix}{reference.key}'
+        elif isinstance(value, dict):
+            yield from template_references(value, f'{prefix}{key}.')
+
+
+def dependent_keys(config_dict, keys):
+    references = list(template_references(config_dict))
+    keys, pending = set(keys), list(keys)
+    while pending:
+        changed = pending.pop()
+        for key, _, target in references:
+            if key not in keys and (target == changed or target.startswith(f'{changed}.')
+                                    or changed.startswith(f'{target}.')):
+                keys.add(key)
+                pending.append(key)
+    return sorted(keys)
+
+
+def get_path(dictionary, key):
+    for part in key.split('.'):
+        if not isinstance(dictionary, dict):
+            return missing
+        dictionary = dictionary.get(part, missing)
+    return dictionary
+
+
+class Watch:
+    def __init__(self, config, callback, refresh, release):
+        self.config = config
+        self.callback = callback
+        self.signature = dict()
+        self.chain = []
+        self.targets = dict()
+        self.__refresh = refresh
+        self.__release = release
+
+    def poll(self, signature=file_signature):
+        if all(signature(path) == value for path, value in self.signature.items()):
+            return
+        try:
+            keys = self.__refresh(self)
+        except Exception as e:
+            warnings.warn(f'Could not reload {self.config.get_name()}: {e}', RuntimeWarning)
+            self.signature = {path: signature(path) for path in self.signature}
+            return
+        if keys:
+            try:
+                self.callback(keys)
+            except Exception as e:
+                # one failing callback must not stop the other watches of the scheduler thread
+                warnings.warn(f'Watch callback {self.callback!r} failed: {e}', RuntimeWarning)
+
+    def stop(self):
+        scheduler.remove(self)
+        self.__release(self)
+
+    def directories(self):
+        return {os.path.dirname(os.path.abspath(path)) for path in self.signature}
+
+
+class Inotify:
+    __events = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200  # modify, attrib, close_write, moves, create, delete
+
+    def __init__(self):
+        self.__libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.__libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.__directories = set()
+
+    def add(self, directory):
+        if directory not in self.__directories:
+            if self.__libc.inotify_add_watch(self.fd, os.fsencode(directory), self.__events) >= 0:
+                self.__directories.add(directory)
+
+    def drain(self):
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def wait(self, timeout):
+        return bool(select.select([self.fd], [], [], timeout)[0])
+
+
+class Scheduler:
+    # Coalescing delay between a filesystem event and the poll it triggers
+    delay = 0.05
+
+    def __init__(self):
+        self.interval = 1.0
+        self.__watches = []
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__inotify = None
+
+    def add(self, watch, interval=None, backend='auto'):
+        with self.__lock:
+            if interval is not None:
+                self.interval = min(self.interval, interval) if self.__watches else interval
+            self.__watches.append(watch)
+            if backend in ('auto', 'inotify') and self.__inotify is None and sys.platform.startswith('linux'):
+                try:
+                    self.__inotify = Inotify()
+                except (OSError, AttributeError):
+                    if backend == 'inotify':
+                        raise
+            if self.__inotify is not None:
+                for directory in watch.directories():
+                    self.__inotify.add(directory)
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__thread = threading.Thread(target=self.__run, name='configDmanager-watch', daemon=True)
+                self.__thread.start()
+
+    def remove(self, watch):
+        with self.__lock:
+            if watch in self.__watches:
+                self.__watches.remove(watch)
+
+    def poll(self):
+        with self.__lock:
+            watches = list(self.__watches)
+        # every path is stat'ed once per cycle, however many watches share it
+        signatures = dict()
+
+        def signature(path):
+            if path not in signatures:
+                signatures[path] = file_signature(path)
+            return signatures[path]
+
+        for watch in watches:
+            try:
+                watch.poll(signature)
+            except Exception as e:
+                warnings.warn(f'Could not poll {watch.config.get_name()}: {e}', RuntimeWarning)
+        if self.__inotify is not None:
+            with self.__lock:
+                for watch in watches:
+                    for directory in watch.directories():
+                        self.__inotify.add(directory)
+
+    def __run(self):
+        while True:
+            with self.__lock:
+                if not self.__watches:
+                    self.__thread = None
+                    return
+            if self.__inotify is not None:
+                if self.__inotify.wait(self.interval):
+                    time.sleep(self.delay)
+                    self.__inotify.drain()
+            else:
+                time.sleep(self.interval)
+            self.poll()
+
+
+scheduler = Scheduler()
@@ -1,10 +1,17 @@
+import io
 import json
+import json.encoder
+import json.scanner
 import yaml
 
 from abc import ABC
 
 
 class TypeBase(ABC):
+    # whether ConfigManager.compiled_cache keeps a binary copy of these files: only worth it for parsers slower
+    # than decoding it
+    compiled = True
+
     @classmethod
     def import_config(cls, config_file, *args, **kwargs):
         pass
@@ -13,6 +20,26 @@ class TypeBase(ABC):
     def export_config(cls, config_dict, file_path, *args, **kwargs):
         pass
 
+    @classmethod
+    def loads(cls, text, *args, **kwargs):
+        return cls.import_config(io.StringIO(text), *args, **kwargs)
+
+    @classmethod
+    def export_config_tree(cls, config, metadata, config_file, *args, **kwargs):
+        config_dict = config.to_dict()
+        config_dict.update(metadata)
+        cls.export_config(config_dict, config_file, *args, **kwargs)
+
+    @classmethod
+    def capabilities(cls):
+        return {'accelerated': False}
+
+    @classmethod
+    def sniff(cls, head):
+        # True when a file starting with head ( its first characters, leading whitespace stripped ) is most likely
+        # of this type, False when it cannot be, None when head cannot tell: it is parsed to find out
+        return None
+
     @classmethod
     def is_readable(cls, file_path):
         try:
@@ -24,20 +51,113 @@ class TypeBase(ABC):
 
 
 class JsonType(TypeBase):
+    # the compiled form is decoded with the json module itself: it could only be slower
+    compiled = False
+
     @classmethod
     def import_config(cls, config_file, *args, **kwargs):
         return json.load(config_file)
 
+    @classmethod
+    def loads(cls, text, *args, **kwargs):
+        return json.loads(text)
+
+    @classmethod
+    def sniff(cls, head):
+        # configs are objects
+        return head[:1] == '{'
+
     @classmethod
     def export_config(cls, config_dict, file_path, *args, **kwargs):
         json.dump(config_dict, file_path, indent=kwargs.get('indent', 2))
 
+    @classmethod
+    def export_config_tree(cls, config, metadata, config_file, *args, **kwargs):
+        # Same output as export_config(config.to_dict() updated with metadata), written while walking the tree:
+        # only the top level is copied
+        config_dict = dict(config.raw_items())
+        config_dict.update(metadata)
+        indent = kwargs.get('indent', 2)
+        if isinstance(indent, int):
+            indent = ' ' * indent
+        chunks = []
+        for chunk in cls.__iterencode(config_dict, indent, '\n'):
+            chunks.append(chunk)
+            if len(chunks) > 4096:
+                config_file.write(''.join(chunks))
+                chunks.clear()
+        config_file.write(''.join(chunks))
+
+    @classmethod
+    def capabilities(cls):
+        return {'accelerated': json.scanner.c_make_scanner is not None,
+                'decoder': 'c' if json.scanner.c_make_scanner is not None else 'python',
+                'encoder': 'c' if json.encoder.c_encode_basestring_ascii is not None else 'python',
+                'streaming_export': True}
+
+    __scalars = {None: 'null', True: 'true', False: 'false'}
+
+    @classmethod
+    def __iterencode(cls, value, indent, newline):
+        if hasattr(value, 'raw_items') or isinstance(value, dict):
+            items = value.raw_items() if hasattr(value, 'raw_items') else value.items()
+            opener, closer = '{', '}'
+        elif isinstance(value, (list, tuple)):
+            items = ((None, item) for item in value)
+            opener, closer = '[', ']'
+        elif type(value) is str:
+            yield json.encoder.encode_basestring_ascii(value)
+            return
+        elif value is None or value is True or value is False:
+            yield cls.__scalars[value]
+            return
+        else:
+            yield int.__repr__(value) if type(value) is int else json.dumps(value)
+            return
+        inner, separator = (newline + indent, ',' + newline + indent) if indent is not None else ('', ', ')
+        empty = True
+        for key, item in items:
+            yield opener + inner if empty else separator
+            empty = False
+            if opener == '{':
+                yield json.encoder.encode_basestring_ascii(key if isinstance(key, str) else cls.__key(key)) + ': '
+            yield from cls.__iterencode(item, indent, inner)
+        yield opener + closer if empty else (newline if indent is not None else '') + closer
+
+    @staticmethod
+    def __key(key):
+        if isinstance(key, (int, float)) or key is None:
+            return json.dumps(key)
+        raise TypeError(f'keys must be str, int, float, bool or None, not {type(key).__name__}')
+
 
 class YamlType(TypeBase):
+    # libyaml bindings when PyYAML was built with them, same results as yaml.safe_load and yaml.dump
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    dumper = getattr(yaml, 'CDumper', yaml.Dumper)
+
     @classmethod
     def import_config(cls, config_file, *args, **kwargs):
-        return yaml.safe_load(config_file)
+        return yaml.load(config_file, Loader=cls.loader)
+
+    @classmethod
+    def loads(cls, text, *args, **kwargs):
+        return yaml.load(text, Loader=cls.loader)
+
+    @classmethod
+    def sniff(cls, head):
+        # YAML has no NUL character, and a flow mapping looks like JSON until parsed
+        if '\0' in head:
+            return False
+        return None if head[:1] == '{' else True
 
     @classmethod
     def export_config(cls, config_dict, file_path, *args, **kwargs):
-        yaml.dump(config_dict, file_path)
+        yaml.dump(config_dict, file_path, Dumper=cls.dumper)
+
+    @classmethod
+    def capabilities(cls):
+        return {'accelerated': cls.loader.__name__.startswith('C') and cls.dumper.__name__.startswith('C'),
+                'loader': cls.loader.__name__,
+                'dumper': cls.dumper.__name__,
+                'streaming_export': False}
@@ -31,6 +31,16 @@ class ConfigNotFoundError(ConfigManagerError):
         return self.message
 
 
+class ConfigImportError(ConfigManagerError):
+    def __init__(self, errors, configs=None):
+        self.errors = errors
+        self.configs = configs or dict()
+        self.message = 'Could not import ' + ', '.join(f'{name} ({error})' for name, error in errors.items())
+
+    def __str__(self):
+        return self.message
+
+
 class FormatExecutorError(Error):
     def __init__(self, msg, type_=None):
         self.msg = msg
@@ -1,6 +1,9 @@
+import io
+import json
 import pytest
 
-from configDmanager import import_config
+from configDmanager import import_config, Config, FileReader
+from configDmanager.config_types import JsonType
 from configDmanager.errors import ReinterpretationError
 
 
@@ -122,9 +125,29 @@ def test_environ_var_works(fstring_conf):
 def test_fstrings_recursion_error(fstring_conf):
     with pytest.raises(ReinterpretationError) as context:
         fstring_conf.value1
-    expected = {'Param (value1: ${value2}) reinterpretation failed: Due to cycle - RecursionError',
-                'Param (value2: ${value1}) reinterpretation failed: Due to cycle - RecursionError'}
-    assert str(context.value) in expected
+    assert str(context.value) == 'Param (value1: ${value2}) reinterpretation failed: ' \
+                                 'Due to cycle: value1 -> value2 -> value1'
+
+
+@pytest.mark.parametrize('conf, cycle', [
+    (Config({'a': '${b.c}', 'b': {'c': '${d}', 'd': '${c}'}}), 'a -> b.c -> d -> c'),
+    (Config({'a': '${b}'}, parent=Config({'b': '${c}', 'c': '${b}'})), 'a -> b -> c -> b')])
+def test_fstrings_cycle_path(conf, cycle):
+    with pytest.raises(ReinterpretationError) as context:
+        conf.a
+    assert str(context.value).endswith(f'reinterpretation failed: Due to cycle: {cycle}')
+    with pytest.raises(ReinterpretationError) as context:
+        conf.validate()
+    assert str(context.value).endswith(f'reinterpretation failed: Due to cycle: {cycle}')
+
+
+def test_validate(conf, fstring_conf):
+    assert conf.validate() is conf
+    assert import_config('PackageConfigs.VersionConfig').validate()
+    with pytest.raises(ReinterpretationError) as context:
+        fstring_conf.validate()
+    assert str(context.value) == "Param (my_other_password: ${passwor}) reinterpretation failed: " \
+                                 "Could not find param 'passwor' in FstringConfig"
 
 
 # noinspection PyStatementEffect
@@ -142,6 +165,19 @@ def test_access_error_message(key, error_type, error_msg, fstring_conf):
     assert str(context.value) == error_msg
 
 
+@pytest.mark.parametrize('mmap_threshold', [1024, 0])
+def test_read_file_cache(mmap_threshold, tmp_path, monkeypatch):
+    monkeypatch.setattr(FileReader, 'mmap_threshold', mmap_threshold)
+    FileReader.clear_cache()
+    (tmp_path / 'cert.pem').write_bytes(b'\x00cert\r\n')
+    config = Config({'text': '${read_file[cert.pem]}', 'raw': '${read_file_bytes[cert.pem]}'}, path=str(tmp_path))
+    assert config.text == '\x00cert\n' and config.raw == b'\x00cert\r\n'
+    assert config.text == '\x00cert\n' and config.raw == b'\x00cert\r\n'
+    assert FileReader.cache_info()['hits'] == 2 and FileReader.cache_info()['misses'] == 2
+    (tmp_path / 'cert.pem').write_bytes(b'renewed')
+    assert config.raw == b'renewed'
+
+
 def test_reinterpretation_escape(fstring_conf):
     assert fstring_conf.get_raw('value3') == r"${Hello World}"
 
@@ -182,3 +218,133 @@ def test_param_setting(key, fstring_conf):
 def test_sub_key_setting(fstring_conf):
     fstring_conf['__version.__patch'] = 8
     assert fstring_conf['__version.__patch'] == 8
+
+
+def test_template_rebuilt_on_set(fstring_conf):
+    assert fstring_conf.mail == 'RandomName@gmail.com'
+    fstring_conf.mail = '${user_info.pass}@${mail_server}'
+    assert fstring_conf.mail == 'mdp@smtp.google.com'
+
+
+def test_resolved_value_invalidated_on_sub_key_set(fstring_conf):
+    assert fstring_conf.version == "0.0.4"
+    fstring_conf['__version.__patch'] = 5
+    assert fstring_conf.version == "0.0.5"
+    fstring_conf.update({'__version': {'__major': 1, '__minor': 2, '__patch': 3}})
+    assert fstring_conf.version == "1.2.3"
+
+
+def test_resolved_value_invalidated_through_parent():
+    parent = Config({'host': 'localhost', 'port': 80})
+    child = Config({'url': 'http://${host}:${port}'}, parent=parent)
+    assert child.url == 'http://localhost:80'
+    parent['port'] = 8080
+    assert child.url == 'http://localhost:8080'
+    child['host'] = 'example.com'
+    assert child.url == 'http://example.com:8080'
+    del child['host']
+    assert child.url == 'http://localhost:8080'
+
+
+def test_executor_values_are_not_memoized(fstring_conf, monkeypatch):
+    assert fstring_conf.my_final_password == '123456 123456'
+    monkeypatch.setenv('pass', 'changed')
+    assert fstring_conf.my_final_password == 'changed changed'
+
+
+def test_freeze(conf):
+    snapshot = conf.freeze()
+    assert snapshot.user_info.user == 'RandomName'
+    assert snapshot['user_info.pass'] == 'mdp'
+    assert snapshot.mail_use_tls
+    assert snapshot['__name'] == 'TestConfig'
+    assert set(snapshot) == {'mail_server', 'mail_port', 'mail_use_tls', 'user_info'}
+    assert get_params(**snapshot[['mail_server']]) == "{'mail_server': 'smtp.google.com'}"
+    with pytest.raises(TypeError):
+        snapshot.mail_port = 25
+    conf.mail_port = 25
+    assert snapshot.mail_port == 587
+
+
+def test_freeze_resolves_references():
+    parent = Config({'__version': {'__major': 0, '__minor': 2, '__patch': 1}, 'classifiers': ['Python 3']})
+    snapshot = Config({'version': '${__version.__major}.${__version.__minor}.${__version.__patch}'}, parent).freeze()
+    assert snapshot.version == snapshot['version'] == '0.2.1'
+    assert snapshot['__version.__patch'] == 1
+    assert snapshot.classifiers == ('Python 3',)
+
+    private_parent = Config({'__version': {'__major': 1}})
+    snapshot = Config({'v': '${__version.__major}'}, parent=private_parent).freeze()
+    assert (snapshot.v, snapshot['__version.__major']) == ('1', 1)  # a parent with no public key is kept
+
+
+def test_lazy_config_matches_eager():
+    data = {'__meta': {'__id': 1}, 'db': {'primary': {'host': 'localhost', 'port': 5432}},
+            'servers': [{'name': 'a'}, 'b'], 'url': '${db.primary.host}:${db.primary.port}',
+            's': {'a': {'c': 2}, 'a.b': 1, 'x': [{'y.z': 3}], 'p.__q': 4}}
+    eager, lazy = Config(data), Config(data, lazy=True)
+    for private in (True, False):
+        assert lazy.to_dict(private=private) == eager.to_dict(private=private)
+        assert dict(lazy.raw_items(private)).keys() == dict(eager.raw_items(private)).keys()
+    assert lazy.to_dict()['s'] == {'a': {'c': 2, 'b': 1}, 'x': [{'y': {'z': 3}}], 'p': {'__q': 4}}
+    assert data['s'] == {'a': {'c': 2}, 'a.b': 1, 'x': [{'y.z': 3}], 'p.__q': 4}
+    stream = io.StringIO()
+    JsonType.export_config_tree(lazy, {}, stream)
+    assert json.loads(stream.getvalue()) == lazy.to_dict()
+    assert lazy.url == eager.url == 'localhost:5432'
+    assert type(lazy.db.primary) == Config
+    assert type(lazy.servers[0]) == Config
+    lazy['db.primary.port'] = 5433
+    assert lazy.url == 'localhost:5433'
+    assert data['db']['primary']['port'] == 5432
+    assert lazy.to_dict(private=False) == dict(eager.to_dict(private=False), url='${db.primary.host}:${db.primary.port}',
+                                               db={'primary': {'host': 'localhost', 'port': 5433}})
+
+
+def test_compact_nodes():
+    config = Config({'__private': 1, 'sub': {'__private': 2, 'key': 3}}, name='Compact')
+    assert not hasattr(config, '__dict__') and not hasattr(config.sub, '__dict__')
+    assert config.get_name() == 'Compact' and config.sub.get_name() is None
+    assert config['__private'] == 1 and config['sub.__private'] == 2
+    with pytest.raises(AttributeError):
+        config.__private
+    assert config.to_dict(private=False) == {'sub': {'key': 3}}
+
+
+def test_key_index():
+    grandparent = Config({'a': 1, 'b': 2, '__name': 'Grandparent'})
+    parent = Config({'b': 3, 'c': '${a}${b}'}, parent=grandparent)
+    config = Config({'d': 4, '__private': 5}, parent=parent)
+    assert len(config) == 4 and sorted(config) == ['a', 'b', 'c', 'd']
+    assert 'a' in config and '__private' in config and 'e' not in config
+    assert dict(config.items()) == {'a': 1, 'b': 3, 'c': '13', 'd': 4} == {**config}
+
+    config['e'] = 6
+    grandparent['f'] = 7
+    del parent['b']
+    assert len(config) == 6 and dict(config.items())['b'] == 2 and config.c == '12' and config.f == 7
+    del config['d']
+    assert 'd' not in config and len(config) == 5
+    config.set_parent(None)
+    assert list(config) == ['e'] and len(config) == 1
+
+
+def test_accessor_and_get_many():
+    parent = Config({'db': {'replica': {'host': 'db2'}}, 'port': 5432})
+    config = Config({'db': {'primary': {'host': 'db1', 'dsn': '${host}:5432'}}, 'url': '${db.primary.host}'},
+                    parent=parent)
+    host = config.accessor('db.primary.host')
+    assert host() == 'db1'
+    config['db.primary.host'] = 'db3'
+    assert host() == 'db3' and config.url == 'db3'
+    with pytest.raises(KeyError):
+        config.accessor('db.primary.missing')()
+
+    assert config.get_many(['db.primary.host', 'db.primary.dsn', 'db.replica.host', 'port']) == \
+        ('db3', 'db3:5432', 'db2', 5432)
+    assert config.get_many({'db.primary.host': 'host', 'port': 'port'}) == {'host': 'db3', 'port': 5432}
+    with pytest.raises(KeyError):
+        config.get_many(['port', 'db.replica.port'])
+    selection = config[['db.primary.host', 'port']]
+    assert type(selection) is Config and selection.db.primary.host == 'db3' and selection.port == 5432
+    assert config[{'db.primary.host': 'host'}].to_dict(private=False) == {'host': 'db3'}
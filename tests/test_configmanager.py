@@ -1,7 +1,22 @@
+import asyncio
+import io
+import json
+import multiprocessing
+import os
 import pytest
+import struct
+import threading
+import time
+import yaml
 
-from configDmanager import import_config, export_config, update_config, Config
-from configDmanager.errors import ConfigNotFoundError, ConfigManagerError
+from multiprocessing import shared_memory
+from configDmanager import import_config, export_config, update_config, Config, ConfigManager, FormatExecutor, \
+    ExecutorRegistry
+from configDmanager import _binary, _shared
+from configDmanager.__main__ import main
+from configDmanager._watch import scheduler
+from configDmanager.config_types import JsonType, YamlType
+from configDmanager.errors import ConfigNotFoundError, ConfigManagerError, FormatExecutorError, ReinterpretationError
 
 
 @pytest.mark.parametrize('config_name, type_', [
@@ -42,6 +57,13 @@ def test_export_config():
     assert val + 1 == config.val
 
 
+def test_export_config_parent_type(tmp_path):
+    (tmp_path / 'Meta.yaml').write_text('__name: Meta\n__type: yaml\n')  # no public key
+    (tmp_path / 'Child.json').write_text('{"__parent": "Meta", "val": 1}')
+    export_config(import_config('Child', str(tmp_path)), 'Exported', str(tmp_path))
+    assert json.loads((tmp_path / 'Exported.json').read_text())['__parent_type'] == 'yaml'
+
+
 def test_update_config_by_dict():
     update_config({'val': 0}, 'configs.ExportConfig')
     config = import_config('configs.ExportConfig')
@@ -59,3 +81,624 @@ def test_update_config_by_callable():
     update_config(lambda conf: {'val': conf['val']+12}, 'configs.ExportConfig')
     config = import_config('configs.ExportConfig')
     assert config.val == 19
+
+
+def test_update_config_is_atomic_and_skips_unchanged_files(tmp_path):
+    config_path = tmp_path / 'Updated.json'
+    export_config(Config({'val': 1}), 'Updated', str(tmp_path))
+    os.utime(config_path, ns=(10 ** 9, 10 ** 9))
+    update_config({'val': 1}, 'Updated', str(tmp_path))
+    assert config_path.stat().st_mtime_ns == 10 ** 9
+    update_config({'val': 2}, 'Updated', str(tmp_path))
+    assert config_path.stat().st_mtime_ns != 10 ** 9 and import_config('Updated', str(tmp_path)).val == 2
+    assert sorted(os.listdir(tmp_path)) == ['Updated.json']
+
+
+def test_transaction(tmp_path):
+    for name in ('First', 'Second'):
+        export_config(Config({'version': 1}), name, str(tmp_path))
+    written = (tmp_path / 'First.json').read_text()
+    with ConfigManager.transaction(lock=True):
+        for name in ('First', 'Second', 'First'):
+            update_config(lambda config: {'version': config.version + 1}, name, str(tmp_path))
+        assert (tmp_path / 'First.json').read_text() == written  # flushed when the transaction ends
+    assert (import_config('First', str(tmp_path)).version, import_config('Second', str(tmp_path)).version) == (3, 2)
+
+    with pytest.raises(RuntimeError):
+        with ConfigManager.transaction():
+            update_config({'version': 10}, 'Second', str(tmp_path))
+            raise RuntimeError
+    assert import_config('Second', str(tmp_path)).version == 2
+
+
+def test_transaction_per_task(tmp_path):
+    for name in ('A', 'B'):
+        export_config(Config({'v': 1}), name, str(tmp_path))
+
+    async def rolled_back():
+        with ConfigManager.transaction():
+            await ConfigManager.update_config_async({'v': 2}, 'A', str(tmp_path))
+            await asyncio.sleep(0.05)
+            raise RuntimeError
+
+    async def unrelated():
+        await asyncio.sleep(0.01)
+        await ConfigManager.update_config_async({'v': 99}, 'B', str(tmp_path))
+
+    async def run():
+        return await asyncio.gather(rolled_back(), unrelated(), return_exceptions=True)
+
+    assert isinstance(asyncio.run(run())[0], RuntimeError)
+    assert (import_config('A', str(tmp_path)).v, import_config('B', str(tmp_path)).v) == (1, 99)
+
+
+def test_transaction_lock(tmp_path):
+    export_config(Config({'count': 0}), 'Counter', str(tmp_path))
+
+    def increment():
+        with ConfigManager.transaction(lock=True):
+            update_config(lambda config: {'count': config.count + 1}, 'Counter', str(tmp_path))
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=increment) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert import_config('Counter', str(tmp_path)).count == 8
+    assert sorted(os.listdir(tmp_path)) == ['.Counter.json.lock', 'Counter.json']
+
+
+@pytest.fixture
+def config_cache(monkeypatch):
+    monkeypatch.setattr(ConfigManager, 'cache_size', 16)
+    ConfigManager.clear_cache()
+    yield ConfigManager
+    ConfigManager.clear_cache()
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    # the type classes whose loads was called, in order: one per file parsed
+    calls = []
+    for type_ in set(ConfigManager.supported_types.values()):
+        monkeypatch.setattr(type_, 'loads', classmethod(lambda cls, text, loads=type_.loads: calls.append(cls) or
+                                                        loads(text)))
+    return calls
+
+
+@pytest.fixture
+def compiled_cache(monkeypatch, parsed):
+    monkeypatch.setattr(ConfigManager, 'compiled_cache', True)
+    return parsed
+
+
+def test_cached_import_returns_independent_configs(config_cache):
+    config = import_config('configs.TestConfig')
+    config.user_info.user = 'AnotherName'
+    misses = config_cache.cache_info()['misses']
+    other = import_config('configs.TestConfig')
+    assert config_cache.cache_info()['misses'] == misses
+    assert other.user_info.user == 'RandomName'
+    assert other is not config
+
+
+def test_cache_invalidated_on_file_change(config_cache, tmp_path):
+    config_file = tmp_path / 'CachedConfig.json'
+    config_file.write_text('{"val": 1}')
+    assert import_config('CachedConfig', str(tmp_path)).val == 1
+    config_file.write_text('{"val": 22}')
+    assert import_config('CachedConfig', str(tmp_path)).val == 22
+    assert config_cache.cache_info()['size'] == 1
+    config_cache.clear_cache()
+    assert config_cache.cache_info()['size'] == 0
+
+
+def test_type_detection_parses_once(parsed):
+    import_config('configs.TestConfig')
+    assert len(parsed) == 2  # TestConfig.json and its parent GmailConfig.yaml
+
+
+def test_type_detection_by_content(tmp_path):
+    (tmp_path / 'NoExtension').write_text('{"val": 3}')
+    (tmp_path / 'NoExtension.txt').write_text('val: 4')
+    (tmp_path / 'NoExtensionOther.json').write_text('{"val": 5}')
+    assert import_config('NoExtension', str(tmp_path)).val in (3, 4)
+    os.remove(tmp_path / 'NoExtension')
+    assert import_config('NoExtension', str(tmp_path)).val == 4
+
+
+def test_type_detection_sniffs_content(tmp_path, parsed):
+    (tmp_path / 'Sniffed.bin').write_bytes(b'\0' * 4096)
+    (tmp_path / 'Sniffed.conf').write_text('val: 4')
+    assert import_config('Sniffed', str(tmp_path)).val == 4
+    assert parsed == [YamlType]  # the binary file is never parsed, and YAML is tried first on the other
+    parsed.clear()
+    (tmp_path / 'Sniffed.conf').write_text('{val: 5}')  # a YAML flow mapping is tried as JSON first
+    assert import_config('Sniffed', str(tmp_path)).val == 5
+    assert parsed == [JsonType, YamlType]
+
+
+def test_compiled_cache(compiled_cache, tmp_path):
+    source = tmp_path / 'Compiled.yaml'
+    source.write_text('name: app\nwhen: 2020-01-02\nports: [1, 2]\nnested: {big: 123456789012345678901234567890}')
+    expected = import_config('Compiled', str(tmp_path)).to_dict()
+    assert (tmp_path / '__configcache__' / 'Compiled.yaml.yaml.cdmb').exists()
+    assert import_config('Compiled', str(tmp_path)).to_dict() == expected
+    assert len(compiled_cache) == 1
+    os.utime(source, ns=(0, 0))  # touched only: the content hash still matches
+    assert import_config('Compiled', str(tmp_path)).to_dict() == expected
+    assert len(compiled_cache) == 1
+    source.write_text('name: ppa\nwhen: 2020-01-02\nports: [1, 2]\nnested: {big: 123456789012345678901234567890}')
+    assert import_config('Compiled', str(tmp_path)).name == 'ppa'
+    assert len(compiled_cache) == 2
+    with pytest.raises(ConfigManagerError):
+        ConfigManager.load_bundle(tmp_path / '__configcache__' / 'Compiled.yaml.yaml.cdmb')
+
+
+def test_compile_command(compiled_cache, tmp_path, capsys, monkeypatch):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'First.json').write_text('{"val": 1}')
+    (tmp_path / 'Second.yml').write_text('val: 2')
+    (tmp_path / 'notes.txt').write_text('val: 3')
+    main(['compile', str(tmp_path), '--cache-dir', str(tmp_path / 'cache')])
+    assert len(capsys.readouterr().out.splitlines()) == 1  # json files are never compiled
+    assert len(os.listdir(tmp_path / 'cache')) == 1
+    compiled_cache.clear()
+    monkeypatch.setattr(ConfigManager, 'compiled_cache_dir', str(tmp_path / 'cache'))
+    assert import_config('First', str(tmp_path / 'sub')).val == 1
+    assert import_config('Second', str(tmp_path)).val == 2
+    assert compiled_cache == [JsonType]
+
+
+def test_bundle(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv('BUNDLE_TOKEN', 'before')
+    (tmp_path / 'key.txt').write_text('secret')
+    (tmp_path / 'Base.yaml').write_text('__name: Base\nport: 1\n')
+    (tmp_path / 'App.json').write_text('{"__parent": "Base", "url": "h:${port}", "key": "${read_file[key.txt]}",'
+                                       ' "token": "t-${os_environ[BUNDLE_TOKEN]}", "db": {"host": "localhost"}}')
+    bundle_path = tmp_path / 'configs.cdmb'
+    main(['bundle', 'App', '--path', str(tmp_path), '-o', str(bundle_path), '--freeze', 'os_environ'])
+    monkeypatch.setenv('BUNDLE_TOKEN', 'after')
+    (tmp_path / 'key.txt').write_text('rotated')
+    try:
+        config = ConfigManager.load_bundle(bundle_path, check=True)['App']
+        assert (config.url, config.token, config.key, config.get_parent().get_name()) == \
+            ('h:1', 't-before', 'rotated', 'Base')
+        (tmp_path / 'App.json').unlink()
+        (tmp_path / 'Base.yaml').unlink()
+        imported = import_config('App', str(tmp_path))
+        assert imported is not config and imported.to_dict() == config.to_dict() and imported.db.host == "localhost"
+    finally:
+        ConfigManager.clear_bundles()
+    with pytest.raises(ConfigManagerError):
+        ConfigManager.load_bundle(bundle_path, check=True)
+    with pytest.raises(ConfigNotFoundError):
+        import_config('App', str(tmp_path))
+    assert _binary.read_header(bundle_path.read_bytes()) is None  # never taken for a compiled config
+
+
+def test_bundle_frozen_values_are_not_interpolated(tmp_path):
+    (tmp_path / 'notes.txt').write_text('use ${missing} as is')
+    (tmp_path / 'Notes.json').write_text('{"notes": "${read_file[notes.txt]}", "title": "N: ${read_file[notes.txt]}"}')
+    (tmp_path / 'Empty.json').write_text('{"__type": "json"}')
+    bundle_path = tmp_path / 'configs.cdmb'
+    ConfigManager.bundle(['Notes', 'Empty'], bundle_path, str(tmp_path), freeze=['read_file'])
+    for name in ('notes.txt', 'Notes.json', 'Empty.json'):
+        (tmp_path / name).unlink()
+    try:
+        ConfigManager.load_bundle(bundle_path)
+        config = import_config('Notes', str(tmp_path))
+        assert (config.notes, config.title) == ('use ${missing} as is', 'N: use ${missing} as is')
+        assert len(import_config('Empty', str(tmp_path))) == 0  # no public key, still served from the bundle
+    finally:
+        ConfigManager.clear_bundles()
+
+
+def test_resolve_and_inspect_commands(tmp_path, capsys):
+    (tmp_path / 'Base.yaml').write_text('__name: Base\nport: 1\n')
+    (tmp_path / 'App.json').write_text('{"__parent": "Base", "url": "h:${port}"}')
+    main(['resolve', 'App', '--path', str(tmp_path)])
+    output = capsys.readouterr().out
+    assert all(f' {phase} ' in output for phase in ('import', 'parse', 'parent', 'interpolation'))
+    assert not ConfigManager.instrumentation.enabled
+    main(['inspect', 'App', '--path', str(tmp_path)])
+    assert capsys.readouterr().out.splitlines() == ["port = 1  [Base]", "url = 'h:1'  [App]"]
+
+
+def attached_host(name, queue):
+    queue.put(ConfigManager.attach(name)['db.host'])
+
+
+def test_shared_config():
+    name = f'cdm-test-{os.getpid()}'
+    config = Config({'__name': 'App', 'port': 1, 'url': 'h:${port}',
+                     'db': {'host': 'localhost', 'ports': [1, {'a': 2}]}})
+    with ConfigManager.publish(config, name) as publisher:
+        with ConfigManager.attach(name) as shared:
+            assert (shared.generation, shared.url, shared['db.host'], shared.get_name()) == \
+                (1, 'h:1', 'localhost', 'App')
+            assert shared.db.ports[1]['a'] == 2 and 'db.ports' in shared and 'db.user' not in shared
+            assert list(shared) == ['port', 'url', 'db'] and shared.to_dict() == config.freeze().to_dict()
+            with pytest.raises(TypeError):
+                shared.db.host = 'remote'
+            db = shared.db
+            assert publisher.publish(Config({'db': {'host': 'remote'}})) == 2
+            assert (shared.generation, shared['db.host'], db.host) == (2, 'remote', 'localhost')
+            with pytest.raises(KeyError):
+                shared['url']
+            queue = multiprocessing.get_context('spawn').Queue()
+            worker = multiprocessing.get_context('spawn').Process(target=attached_host, args=(name, queue))
+            worker.start()
+            worker.join()
+            assert queue.get(timeout=5) == 'remote' and shared['db.host'] == 'remote'
+        with pytest.raises(ConfigManagerError):
+            ConfigManager.publish(config, name)
+    with pytest.raises(ConfigNotFoundError):
+        ConfigManager.attach(name)
+
+
+def test_shared_config_torn_generation(monkeypatch):
+    name = f'cdm-torn-{os.getpid()}'
+    monkeypatch.setattr(_shared, '_retries', 10)
+    with ConfigManager.publish(Config({'val': 1}), name):
+        with ConfigManager.attach(name) as shared:
+            control = shared_memory.SharedMemory(name)
+            try:
+                struct.pack_into('<q', control.buf, 16, 2)  # only one copy of a new generation written
+                with pytest.raises(ConfigManagerError):
+                    shared['val']
+                struct.pack_into('<q', control.buf, 16, 1)
+                assert shared['val'] == 1
+            finally:
+                control.close()
+
+
+@pytest.mark.parametrize('indent', [2, 4, None, '\t'])
+@pytest.mark.parametrize('lazy', [False, True])
+def test_streaming_json_export_parity(indent, lazy):
+    config = Config({'a': {'b': [1, {'c': 'é'}, []], 'empty': {}}, 'f': 2.5, 'n': None, 't': (True, 'x'),
+                     'text': '${a.b}'}, parent=import_config('configs.TestConfig'), name='Streamed', lazy=lazy)
+    metadata = {'__name': 'Renamed', '__type': 'json'}
+    streamed = io.StringIO()
+    JsonType.export_config_tree(config, metadata, streamed, indent=indent)
+    config_dict = config.to_dict()
+    config_dict.update(metadata)
+    assert streamed.getvalue() == json.dumps(config_dict, indent=indent)
+
+
+@pytest.mark.parametrize('config_name', ['configs.YamlConfig', 'configs.GmailConfig', 'configs.TestConfig'])
+def test_accelerated_yaml_parity(config_name):
+    config_dict = import_config(config_name).to_dict()
+    text = yaml.dump(config_dict, Dumper=yaml.Dumper)
+    assert yaml.dump(config_dict, Dumper=YamlType.dumper) == text
+    assert YamlType.loads(text) == yaml.safe_load(text) == config_dict
+
+
+def test_capabilities():
+    capabilities = ConfigManager.capabilities()
+    assert capabilities['json']['streaming_export']
+    assert capabilities['yaml']['accelerated'] == yaml.__with_libyaml__
+
+
+def test_locate():
+    assert ConfigManager.locate('configs.TestConfig').parts[-2:] == ('configs', 'TestConfig.json')
+    assert ConfigManager.locate('configs.YamlConfig', type_='YAML').name == 'YamlConfig.yaml'
+    with pytest.raises(ConfigNotFoundError):
+        ConfigManager.locate('FstringConfig')
+
+
+def test_locate_follows_new_files(tmp_path, monkeypatch):
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    first.mkdir()
+    second.mkdir()
+    (second / 'LocatedConfig.json').write_text('{"val": 2}')
+    monkeypatch.syspath_prepend(str(second))
+    assert ConfigManager.locate('LocatedConfig', str(first)) == second / 'LocatedConfig.json'
+    (first / 'LocatedConfig.yaml').write_text('val: 1')
+    assert ConfigManager.locate('LocatedConfig', str(first)) == first / 'LocatedConfig.yaml'
+    assert import_config('LocatedConfig', str(first)).val == 1
+
+
+@pytest.fixture
+def lazy_parent(monkeypatch):
+    monkeypatch.setattr(ConfigManager, 'lazy_parent', True)
+    return ConfigManager
+
+
+def test_lazy_parent_loaded_on_first_miss(lazy_parent, tmp_path):
+    (tmp_path / 'ChildConfig.json').write_text('{"__parent": "ParentConfig", "local": 1}')
+    config = import_config('ChildConfig', str(tmp_path))
+    assert config.local == 1
+    with pytest.raises(ConfigNotFoundError):
+        config.inherited
+    (tmp_path / 'ParentConfig.json').write_text('{"__name": "ParentConfig", "inherited": 2}')
+    config = import_config('ChildConfig', str(tmp_path))
+    assert config.to_dict(private=True) == {'__parent': 'ParentConfig', 'local': 1, '__name': 'ChildConfig'}
+    assert config.inherited == 2
+    assert config.to_dict(private=False, include_parent=True) == {'local': 1, 'inherited': 2}
+
+
+def test_lazy_parent_name(lazy_parent):
+    config = import_config('configs.FstringConfig')
+    unloaded = config.to_dict()
+    assert unloaded['__parent'] == 'TestConfig' and dict(config.raw_items())['__parent'] == 'TestConfig'
+    assert config.get_parent() is not None and config.to_dict() == unloaded
+
+
+def test_import_configs():
+    configs = ConfigManager.import_configs(['configs.TestConfig', 'configs.FstringConfig', 'configs.YamlConfig'],
+                                           max_workers=4)
+    assert list(configs) == ['configs.TestConfig', 'configs.FstringConfig', 'configs.YamlConfig']
+    assert configs['configs.FstringConfig'].mail == 'RandomName@gmail.com'
+    assert configs['configs.TestConfig'].mail_use_tls
+    assert configs['configs.TestConfig'] is not configs['configs.FstringConfig'].get_parent()
+    assert configs['configs.FstringConfig'].to_dict() == import_config('configs.FstringConfig').to_dict()
+
+
+def test_import_configs_aggregates_errors(tmp_path):
+    (tmp_path / 'First.json').write_text('{"__parent": "Base", "val": 1}')
+    (tmp_path / 'Second.yaml').write_text('__parent: Base\nval: 2')
+    (tmp_path / 'Orphan.json').write_text('{"__parent": "Missing"}')
+    (tmp_path / 'Base.json').write_text('{"__name": "Base", "shared": true}')
+    with pytest.raises(ConfigManagerError) as context:
+        ConfigManager.import_configs(['First', 'Second', 'Orphan', 'Unknown'], str(tmp_path))
+    errors, configs = context.value.errors, context.value.configs
+    assert set(errors) == {'Orphan', 'Unknown'}
+    assert all(isinstance(error, ConfigNotFoundError) for error in errors.values())
+    assert configs['First'].shared and configs['Second'].val == 2
+    # like with import_config, each config has its own parents
+    configs['First'].get_parent().shared = False
+    assert configs['Second'].shared
+
+
+def test_import_configs_lazy_parent_and_bundles(lazy_parent, tmp_path):
+    (tmp_path / 'Base.json').write_text('{"__name": "Base", "port": 1}')
+    (tmp_path / 'Child.json').write_text('{"__parent": "Base", "val": 1}')
+    (tmp_path / 'Bundled.json').write_text('{"__parent": "Base", "val": 2}')
+    ConfigManager.bundle(['Bundled'], tmp_path / 'configs.cdmb', str(tmp_path))
+    (tmp_path / 'Bundled.json').unlink()
+    try:
+        ConfigManager.load_bundle(tmp_path / 'configs.cdmb')
+        configs = ConfigManager.import_configs(['Child', 'Bundled'], str(tmp_path))
+    finally:
+        ConfigManager.clear_bundles()
+    assert list(configs) == ['Child', 'Bundled'] and configs['Bundled'].val == 2
+    (tmp_path / 'Base.json').write_text('{"__name": "Base", "port": 2}')
+    assert configs['Child'].port == 2  # the parent is only read on first use
+
+
+def test_import_config_async(tmp_path):
+    (tmp_path / 'content.txt').write_text('file content')
+    (tmp_path / 'AsyncConfig.json').write_text('{"__parent": "configs.TestConfig", "text": "${read_file[content.txt]}",'
+                                               ' "mail": "${user_info.user}@${mail_server}"}')
+    config = asyncio.run(ConfigManager.import_config_async('AsyncConfig', str(tmp_path)))
+    assert config.mail == 'RandomName@smtp.google.com'
+    assert config.mail_port == 587
+    assert config.text == 'file content'
+    (tmp_path / 'content.txt').write_text('changed')
+    assert config.text == 'changed'  # read on access, like with import_config
+    config = asyncio.run(ConfigManager.import_config_async('AsyncConfig', str(tmp_path), prefetch=True))
+    os.remove(tmp_path / 'content.txt')
+    assert config.text == 'changed'  # prefetched while importing
+
+
+def test_import_config_async_lazy_parent(lazy_parent, tmp_path):
+    (tmp_path / 'Child.json').write_text('{"__parent": "Base", "val": 1}')
+    config = asyncio.run(ConfigManager.import_config_async('Child', str(tmp_path)))
+    assert config.val == 1 and config.to_dict()['__parent'] == 'Base'
+    (tmp_path / 'Base.json').write_text('{"__name": "Base", "port": 2}')
+    assert config.port == 2  # the parent is only read on first use, like with import_config
+
+
+def test_async_import_follows_prefetch_policy(tmp_path, monkeypatch):
+    class AsyncReader(FormatExecutor):
+        async def _execute(self, item):
+            await asyncio.sleep(0)
+            return item.upper()
+
+    registry = ExecutorRegistry(ConfigManager.executors)
+    registry.register('upper', AsyncReader())
+    monkeypatch.setattr(ConfigManager, 'executors', registry)
+    monkeypatch.setenv('ASYNC_POLICY', 'one')
+    (tmp_path / 'Policy.json').write_text('{"env": "${os_environ[ASYNC_POLICY]}", "up": "${upper[value]}"}')
+    sync_config = import_config('Policy', str(tmp_path))
+    async_config = asyncio.run(ConfigManager.import_config_async('Policy', str(tmp_path)))
+    assert async_config.up == 'VALUE'  # asynchronous executors are always prefetched
+    monkeypatch.setenv('ASYNC_POLICY', 'two')
+    assert sync_config.env == async_config.env == 'two'
+
+
+def test_update_config_async():
+    async def mod(conf):
+        return {'val': conf['val'] + 1}
+
+    val = import_config('configs.ExportConfig').val
+    config = asyncio.run(ConfigManager.update_config_async(mod, 'configs.ExportConfig'))
+    assert config.val == import_config('configs.ExportConfig').val == val + 1
+    asyncio.run(ConfigManager.update_config_async({'val': val}, 'configs.ExportConfig'))
+    assert import_config('configs.ExportConfig').val == val
+
+
+def test_async_format_executor():
+    class AsyncReader(FormatExecutor):
+        async def _execute(self, item):
+            await asyncio.sleep(0)
+            return item.upper()
+
+    assert asyncio.run(AsyncReader().execute_async('value')) == 'VALUE'
+    with pytest.raises(FormatExecutorError):
+        AsyncReader()['value']
+
+
+class SecretStore(FormatExecutor):
+    def __init__(self):
+        self.batches = []
+        self.secrets = {'db': 'hunter2', 'api': 'token'}
+
+    def _execute(self, item):
+        self.batches.append([item])
+        return self.secrets[item]
+
+    def execute_many(self, items):
+        self.batches.append(sorted(items))
+        return {item: self.secrets[item] for item in items if item in self.secrets}
+
+
+@pytest.fixture
+def secret_manager():
+    class SecretManager(ConfigManager):
+        executors = ExecutorRegistry(ConfigManager.executors)
+        prefetch = True
+
+    store = SecretStore()
+    SecretManager.executors.register('secret', store, ttl=60)
+    return SecretManager, store
+
+
+def test_executor_registry_prefetch(secret_manager, tmp_path):
+    manager, store = secret_manager
+    (tmp_path / 'Secrets.json').write_text('{"db": "${secret[db]}", "dsn": "user:${secret[db]}@host",'
+                                           ' "nested": {"api": "${secret[api]}"}, "other": "${secret[missing]}"}')
+    config = manager.import_config('Secrets', str(tmp_path))
+    assert store.batches == [['api', 'db', 'missing']]
+    assert (config.db, config.dsn, config.nested.api) == ('hunter2', 'user:hunter2@host', 'token')
+    assert store.batches == [['api', 'db', 'missing']]  # served from the executor cache until the ttl expires
+    with pytest.raises(ReinterpretationError):
+        config.other
+    with pytest.raises(ReinterpretationError):
+        import_config('Secrets', str(tmp_path)).db  # only registered for SecretManager
+
+
+@pytest.mark.parametrize('share', [False, True])
+def test_watch_updates_in_place(tmp_path, monkeypatch, share):
+    monkeypatch.setattr(ConfigManager, 'share', share)
+    (tmp_path / 'key.txt').write_text('secret')
+    (tmp_path / 'Base.json').write_text('{"__name": "Base", "port": 1}')
+    (tmp_path / 'Watched.json').write_text('{"__parent": "Base", "db": {"host": "a", "user": "u"},'
+                                           ' "key": "${read_file[key.txt]}", "url": "${db.host}:${port}"}')
+    changes = []
+    watch = ConfigManager.watch('Watched', changes.append, str(tmp_path))
+    config = watch.config
+    try:
+        assert config.url == 'a:1' and config.key == 'secret'
+        watch.poll()
+        assert changes == []
+        (tmp_path / 'Watched.json').write_text('{"__parent": "Base", "db": {"host": "bb"},'
+                                               ' "key": "${read_file[key.txt]}", "url": "${db.host}:${port}"}')
+        watch.poll()
+        assert changes.pop() == ['db.host', 'db.user', 'url']
+        assert config.url == 'bb:1' and 'user' not in config.db
+        (tmp_path / 'Base.json').write_text('{"__name": "Base", "port": 22}')
+        (tmp_path / 'key.txt').write_text('rotated')
+        watch.poll()
+        assert changes.pop() == ['key', 'port', 'url']
+        assert config.url == 'bb:22' and config.key == 'rotated'
+    finally:
+        watch.stop()
+
+
+def test_watch_callback_errors_do_not_stop_other_watches(tmp_path):
+    (tmp_path / 'Failing.json').write_text('{"val": 1}')
+    (tmp_path / 'Healthy.json').write_text('{"val": 1}')
+    changes = []
+
+    def fail(keys):
+        raise ValueError('callback failed')
+
+    failing = ConfigManager.watch('Failing', fail, str(tmp_path))
+    healthy = ConfigManager.watch('Healthy', changes.append, str(tmp_path))
+    try:
+        (tmp_path / 'Failing.json').write_text('{"val": 2}')
+        (tmp_path / 'Healthy.json').write_text('{"val": 2}')
+        with pytest.warns(RuntimeWarning, match='callback failed'):
+            scheduler.poll()
+        assert failing.config.val == healthy.config.val == 2 and changes == [['val']]
+    finally:
+        failing.stop()
+        healthy.stop()
+
+
+def test_watch_keeps_config_on_parse_error(tmp_path):
+    (tmp_path / 'Broken.json').write_text('{"val": 1}')
+    changes = []
+    watch = ConfigManager.watch('Broken', changes.append, str(tmp_path))
+    try:
+        (tmp_path / 'Broken.json').write_text('{"val": ')
+        with pytest.warns(RuntimeWarning):
+            watch.poll()
+        assert watch.config.val == 1 and changes == []
+    finally:
+        watch.stop()
+
+
+@pytest.fixture
+def sharing(monkeypatch, tmp_path):
+    monkeypatch.setattr(ConfigManager, 'share', True)
+    (tmp_path / 'Base.json').write_text('{"__name": "Base", "db": {"host": "h", "port": 1}}')
+    for tenant in ('TenantA', 'TenantB'):
+        (tmp_path / f'{tenant}.json').write_text('{"__parent": "Base", "block": {"host": "x", "tags": ["a", "b"],'
+                                                 ' "tls": {"enabled": true}}, "url": "${block.host}:${db.port}",'
+                                                 f' "tenant": "{tenant}"}}')
+    return str(tmp_path)
+
+
+def test_shared_configs(sharing):
+    saved = ConfigManager.sharing_report()['bytes_saved']
+    tenant_a = import_config('TenantA', sharing)
+    tenant_b = import_config('TenantB', sharing)
+    assert tenant_a.block is tenant_b.block and tenant_a.get_parent() is tenant_b.get_parent()
+    assert ConfigManager.sharing_report()['bytes_saved'] > saved
+    with pytest.raises(TypeError):
+        tenant_a.block.host = 'changed'
+    with pytest.raises(TypeError):
+        tenant_a.block.tls['enabled'] = False
+    with pytest.raises(TypeError):
+        del tenant_a.get_parent()['db.port']
+    assert (tenant_b.block.host, tenant_b.block.tls.enabled, tenant_b.db.port) == ('x', True, 1)
+
+    tenant_a['block.host'] = 'y'
+    assert (tenant_a.url, tenant_b.url) == ('y:1', 'x:1')
+    assert tenant_a.block is not tenant_b.block and tenant_a.block.tls is tenant_b.block.tls
+
+    del tenant_a['block.tls.enabled']
+    assert 'enabled' in tenant_b.block.tls and 'enabled' not in tenant_a.block.tls
+    tenant_a.block.tls.version = 3
+    assert tenant_a['block.tls.version'] == 3 and 'version' not in tenant_b.block.tls
+
+
+@pytest.fixture
+def instrumentation():
+    ConfigManager.instrumentation.reset()
+    ConfigManager.instrumentation.enable()
+    yield ConfigManager.instrumentation
+    ConfigManager.instrumentation.disable()
+    ConfigManager.instrumentation.reset()
+
+
+def test_instrumentation(instrumentation, tmp_path):
+    (tmp_path / 'key.txt').write_text('secret')
+    (tmp_path / 'Base.yaml').write_text('__name: Base\nport: 1\n')
+    (tmp_path / 'Traced.json').write_text('{"__parent": "Base", "key": "${read_file[key.txt]}", "url": "h:${port}"}')
+    spans = []
+
+    def hook(phase, start, duration, details, error):
+        spans.append((phase, details))
+
+    instrumentation.add_hook(hook)
+    try:
+        config = import_config('Traced', str(tmp_path))
+        assert (config.url, config.key) == ('h:1', 'secret')
+        export_config(config, 'Exported', str(tmp_path))
+    finally:
+        instrumentation.remove_hook(hook)
+    stats = ConfigManager.stats()
+    assert {'import', 'search', 'detect', 'read', 'parse', 'parent', 'interpolation', 'executor', 'export'} <= \
+        set(stats)
+    assert stats['import']['count'] == 1 and stats['parent']['count'] == 1 and stats['import']['seconds'] > 0
+    assert ('import', {'name': 'Traced', 'path': str(tmp_path)}) in spans
+    assert ('executor', {'name': 'read_file', 'argument': 'key.txt'}) in spans
+
+    instrumentation.disable()
+    import_config('Traced', str(tmp_path))
+    assert ConfigManager.stats()['import']['count'] == 1